@@ -0,0 +1,44 @@
+"""Churn breakdowns for every chart dimension: per-chart lambda groupbys vs ``churn_breakdowns``.
+
+    python -m benchmarks.bench_aggregation --rows 7k,100k,1M,10M
+"""
+
+import argparse
+
+from benchmarks.common import best_of, load, parse_sizes
+from telco_churn.aggregation import churn_breakdowns, churn_flag
+from telco_churn.streaming import CHURN_DIMENSIONS
+
+
+def lambdas(df):
+    """The dashboard's original per-chart aggregation."""
+    tables = {}
+    for dim in CHURN_DIMENSIONS:
+        table = df.groupby(dim, observed=True).agg({
+            "Churn": lambda x: (x == "Yes").sum(),
+            dim: "count",
+        }).rename(columns={dim: "Total"}).sort_index()
+        table["Churn_Rate"] = (table["Churn"] / table["Total"] * 100).round(1)
+        tables[dim] = table.reset_index()
+    return tables
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="7k,100k,1M,10M")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'lambdas (ms)':>13} {'engine (ms)':>12} {'flag once (ms)':>15}")
+    for n_rows in parse_sizes(args.rows):
+        df = load(n_rows)
+        old = best_of(lambda: lambdas(df), args.repeat)
+        new = best_of(lambda: churn_breakdowns(df, CHURN_DIMENSIONS), args.repeat)
+        flag = churn_flag(df["Churn"])
+        reused = best_of(lambda: churn_breakdowns(df, CHURN_DIMENSIONS, flag), args.repeat)
+        print(f"{n_rows:>12,} {old * 1e3:>13.1f} {new * 1e3:>12.1f} {reused * 1e3:>15.1f}")
+        del df, flag
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Monthly Charges box plot: raw values through ``px.box`` vs cube sketches through ``status_box``.
+
+Reports build + serialize time and payload size of both figures, the cost of
+the sketch columns in the cube, and the largest relative error of the
+sketch quartiles against exact ones.
+
+    python -m benchmarks.bench_box --rows 7k,100k,1M,10M
+"""
+
+import argparse
+import time
+
+import numpy as np
+import plotly.express as px
+
+from benchmarks.common import best_of, load, parse_sizes
+from telco_churn.charts import TEMPLATE, status_box
+from telco_churn.cube import ChurnCube
+from telco_churn.palette import COLORS, STATUS_COLORS
+
+# The raw-value box plot is not worth serializing beyond this many rows
+LEGACY_MAX_ROWS = 1_000_000
+
+TITLE = "Monthly Charges Distribution by Churn Status"
+
+
+def legacy(df):
+    """The dashboard's original chart block."""
+    fig = px.box(df, y="MonthlyCharges", x="ChurnStatus", title=TITLE, color="ChurnStatus",
+                 color_discrete_map=STATUS_COLORS)
+    fig.update_traces(marker=dict(line=dict(color=COLORS['light'], width=1)), boxmean=True)
+    fig.update_layout(template=TEMPLATE, yaxis_title="Monthly Charges ($)", showlegend=True)
+    return fig
+
+
+def measure(build, repeat):
+    spec = build().to_json()
+    return best_of(lambda: build().to_json(), repeat), len(spec)
+
+
+def quartile_error(df, stats):
+    worst = 0.0
+    for status, summary in stats.items():
+        values = df.loc[df["ChurnStatus"] == status, "MonthlyCharges"].to_numpy(dtype=np.float64)
+        exact = np.quantile(values, [0.25, 0.5, 0.75])
+        approx = np.array([summary["q1"], summary["median"], summary["q3"]])
+        worst = max(worst, float(np.max(np.abs(approx - exact) / exact)))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="7k,100k,1M,10M")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'px (ms)':>9} {'px (KB)':>9} {'cube (ms)':>10} {'cube (KB)':>10} "
+          f"{'build (s)':>10} {'no sketch (s)':>14} {'cells':>7} {'cube (MB)':>10} {'q err':>7}")
+    for n_rows in parse_sizes(args.rows):
+        df = load(n_rows)
+        before = ("-", "-")
+        if n_rows <= LEGACY_MAX_ROWS:
+            seconds, size = measure(lambda: legacy(df), args.repeat)
+            before = (f"{seconds * 1e3:.1f}", f"{size / 1024:.1f}")
+
+        start = time.perf_counter()
+        cube = ChurnCube.from_frame(df)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        ChurnCube.from_frame(df, sketch_cols=[])
+        plain = time.perf_counter() - start
+
+        def draw():
+            # A fresh filter state would find no cached sketch matrices or masks either
+            cube._sketches.clear()
+            cube._masks.clear()
+            return status_box(cube.box_stats("MonthlyCharges"), "MonthlyCharges", TITLE, "Monthly Charges ($)")
+
+        seconds, size = measure(draw, args.repeat)
+        cells = cube.cuboids[None]
+        print(f"{n_rows:>12,} {before[0]:>9} {before[1]:>9} {seconds * 1e3:>10.1f} {size / 1024:>10.1f} "
+              f"{build:>10.1f} {plain:>14.1f} {len(cells):>7,} {cells.memory_usage().sum() / 2**20:>10.1f} "
+              f"{quartile_error(df, cube.box_stats('MonthlyCharges')):>7.2%}")
+        del df, cube, cells
+
+
+if __name__ == "__main__":
+    main()
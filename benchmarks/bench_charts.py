@@ -0,0 +1,75 @@
+"""Build time of each churn-rate bar chart: the old px.bar + iterrows pattern vs ``churn_rate_bar``.
+
+    python -m benchmarks.bench_charts
+"""
+
+import argparse
+
+import plotly.express as px
+
+from benchmarks.common import best_of
+from telco_churn.charts import churn_rate_bar
+from telco_churn.cube import load_cube
+from telco_churn.palette import COLORS
+
+# dim: (title, text position, bargap, y axis top, per-bar labels, highlight max)
+CHARTS = {
+    "Gender": ("Churn Rate by Gender", "auto", 0.3, lambda top: top + 10, True, False),
+    "CitizenshipStatus": ("Churn Rate by Age Group", "auto", 0.3, lambda top: top + 10, True, False),
+    "Contract": ("Churn Rate by Contract Type", "outside", 0.2, None, False, True),
+    "Internet Service": ("Churn Rate by Internet Service", "outside", 0.2, lambda top: top * 1.1, True, False),
+    "Phone Service": ("Churn Rate by Phone Service", "outside", 0.2, lambda top: top * 1.1, True, False),
+    "Number of Referrals": ("Churn Rate by Number of Referrals", "outside", 0.2, lambda top: top * 1.1, True, False),
+    "Satisfaction Score": ("Churn Rate by Satisfaction Score", "outside", 0.2, None, False, True),
+}
+
+
+def legacy(table, dim, title, text_position, bargap, y_max, labels, highlight_max):
+    """The dashboard's original chart block."""
+    fig = px.bar(table, x=dim, y="Churn_Rate", title=title, color="Churn_Rate",
+                 color_continuous_scale=[[0, COLORS['success']], [1, COLORS['danger']]], text="Churn_Rate")
+    fig.update_traces(texttemplate='%{text}%', textposition=text_position,
+                      marker=dict(line=dict(color=COLORS['light'], width=1)))
+    max_churn_rate = table["Churn_Rate"].max()
+    if labels:
+        for index, row in table.iterrows():
+            offset = 2 if row["Churn_Rate"] < max_churn_rate * 0.7 else 5
+            fig.add_annotation(x=row[dim], y=row["Churn_Rate"] + offset, text=f"{row['Churn_Rate']}%",
+                               showarrow=False, font=dict(size=12, color=COLORS['primary']),
+                               bgcolor=COLORS['surface'], bordercolor=COLORS['border'], borderwidth=1, opacity=0.9)
+    fig.update_layout(template='plotly_dark', font=dict(family="Inter", size=14, color=COLORS['primary']),
+                      paper_bgcolor=COLORS['background'], plot_bgcolor=COLORS['background'],
+                      title=dict(font=dict(size=20, color=COLORS['primary']), x=0.5),
+                      yaxis_title="Churn Rate (%)", showlegend=False, bargap=bargap)
+    if y_max is not None:
+        fig.update_layout(yaxis_range=[0, y_max])
+    if highlight_max:
+        peak = table.loc[table["Churn_Rate"].idxmax(), dim]
+        fig.add_annotation(x=peak, y=max_churn_rate, text=f"Highest churn: {max_churn_rate:.1f}%",
+                           showarrow=True, arrowhead=1, yshift=10,
+                           font=dict(color=COLORS['primary'], size=12), bgcolor=COLORS['surface'])
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tables = load_cube().breakdowns(list(CHARTS))
+    print(f"{'chart':>20} {'bars':>5} {'before (ms)':>12} {'after (ms)':>11}")
+    totals = [0.0, 0.0]
+    for dim, (title, position, bargap, top, labels, highlight) in CHARTS.items():
+        table = tables[dim]
+        y_max = top(table["Churn_Rate"].max()) if top else None
+        args_ = (table, dim, title, position, bargap, y_max, labels, highlight)
+        before = best_of(lambda: legacy(*args_), args.repeat)
+        after = best_of(lambda: churn_rate_bar(*args_), args.repeat)
+        totals[0] += before
+        totals[1] += after
+        print(f"{dim:>20} {len(table):>5} {before * 1e3:>12.1f} {after * 1e3:>11.1f}")
+    print(f"{'all seven':>20} {'':>5} {totals[0] * 1e3:>12.1f} {totals[1] * 1e3:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
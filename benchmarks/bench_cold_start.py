@@ -0,0 +1,42 @@
+"""Compare cold-start load times of the CSV path and the Parquet snapshot.
+
+    python -m benchmarks.bench_cold_start --rows 7k,1M,10M
+"""
+
+import argparse
+import shutil
+import tempfile
+
+from benchmarks.common import parse_sizes, synthesize, timed
+from telco_churn.data import load_dataset, read_source
+
+
+def run(n_rows):
+    path = synthesize(n_rows)
+    snapshot_dir = tempfile.mkdtemp(prefix="telco-snapshot-")
+    try:
+        csv_s, df = timed(read_source, path)
+        del df
+        build_s, df = timed(load_dataset, path, snapshot_dir)
+        del df
+        warm_s, df = timed(load_dataset, path, snapshot_dir)
+        del df
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+    return {"rows": n_rows, "csv_s": csv_s, "first_build_s": build_s, "snapshot_s": warm_s}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="7k,1M,10M", help="comma separated row counts")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'csv (s)':>10} {'build (s)':>10} {'snapshot (s)':>13} {'speedup':>8}")
+    for n_rows in parse_sizes(args.rows):
+        r = run(n_rows)
+        print(f"{r['rows']:>12,} {r['csv_s']:>10.3f} {r['first_build_s']:>10.3f} "
+              f"{r['snapshot_s']:>13.3f} {r['csv_s'] / r['snapshot_s']:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""KPI row and bar chart latency: groupbys over the filtered rows vs the churn cube.
+
+    python -m benchmarks.bench_cube --rows 7k,100k,1M,10M
+"""
+
+import argparse
+import pickle
+
+from benchmarks.bench_filters import STATE
+from benchmarks.common import best_of, load, parse_sizes, timed
+from telco_churn.cube import ChurnCube
+from telco_churn.filters import FilterEngine
+from telco_churn.streaming import CHURN_DIMENSIONS
+
+
+def scan(filtered_df):
+    """The dashboard's KPI and bar chart aggregations over the filtered frame."""
+    churned = filtered_df[filtered_df["Churn"] == "Yes"]
+    kpis = (len(filtered_df), len(churned), churned["MonthlyCharges"].sum(),
+            filtered_df["MonthlyCharges"].mean())
+    charts = [
+        filtered_df.groupby(dim, observed=True).agg({
+            "Churn": lambda x: (x == "Yes").sum(),
+            dim: "count",
+        })
+        for dim in CHURN_DIMENSIONS
+    ]
+    revenue = filtered_df["TotalCharges"].astype("float64").groupby(
+        filtered_df["ChurnStatus"], observed=True).sum()
+    return kpis, charts, revenue
+
+
+def query(cube):
+    # Every rerun with a new filter state starts without cached masks
+    cube._masks.clear()
+    return cube.kpis(STATE), [cube.breakdown(dim, STATE) for dim in CHURN_DIMENSIONS], \
+        cube.revenue_by_status(STATE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="7k,100k,1M,10M")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'scan (ms)':>10} {'build (s)':>10} {'cells':>9} {'size (MB)':>10} {'cube (ms)':>10}")
+    for n_rows in parse_sizes(args.rows):
+        df = load(n_rows)
+        filtered_df = df.take(FilterEngine(df).select(STATE))
+        old = best_of(lambda: scan(filtered_df), args.repeat)
+        build, cube = timed(ChurnCube.from_frame, df)
+        cells = sum(len(cube.cells(key)) for key in cube.cuboids)
+        size = len(pickle.dumps(cube)) / 2**20
+        new = best_of(lambda: query(cube), args.repeat)
+        print(f"{n_rows:>12,} {old * 1e3:>10.1f} {build:>10.2f} {cells:>9,} {size:>10.1f} {new * 1e3:>10.1f}")
+        del df, filtered_df, cube
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Headless end-to-end benchmark of the dashboard at growing dataset sizes.
+
+Every size runs in a fresh interpreter pointed at a synthesized dataset
+(``TELCO_DATA_PATH``) and drives ``telco_churn_dashboard.py`` through
+Streamlit's ``AppTest`` like a visitor would:
+
+* ``first_run``: the cold first run, which loads the data, builds the filter
+  indexes and the cube and renders the default section;
+* ``rerun``: the same state again;
+* ``filter``: a new gender selection;
+* ``section:<name>``: switching to each analysis section;
+* ``export``: preparing the filtered Parquet export.
+
+For every step it records the wall time, the peak RSS of the process so far
+and the time spent in each library stage (``STAGES``: loading, indexing, the
+filter selection, the KPI and per-chart aggregations, figure building and the
+export). The first run against a new size also writes its snapshot and cube
+to disk. They go to ``CACHE_DIR`` (through ``TELCO_SNAPSHOT_DIR`` and
+``TELCO_EXPORT_DIR``), never to the dashboard's own ``dataset/.cache``, and
+are removed once the size is measured; pass ``--keep-cache`` and run twice to
+measure a restart.
+
+Results go to a JSON file tagged with the commit; ``--compare`` prints the
+step times against an earlier file.
+
+    python -m benchmarks.bench_dashboard --rows 7k,100k,1M,10M --output bench_dashboard.json
+    python -m benchmarks.bench_dashboard --rows 7k,100k --compare bench_dashboard.json
+    python -m benchmarks.bench_dashboard --rows 1M --keep-cache  # twice, for the restart
+"""
+
+import argparse
+import functools
+import glob
+import importlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.common import SCRATCH_DIR, parse_sizes, synthesize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "telco_churn_dashboard.py")
+
+# Snapshots, cubes and exports of the benchmarked datasets, one directory per size
+CACHE_DIR = os.path.join(SCRATCH_DIR, "dashboard")
+
+# stage: (module, attribute) of the calls timed in it
+STAGES = {
+    "load": [("telco_churn.shared", "load_shared_dataset")],
+    "index": [("telco_churn.filters", "FilterEngine.__init__")],
+    "cube": [("telco_churn.cube", "load_cube")],
+    "filter": [("telco_churn.filters", "FilterEngine.select")],
+    "kpis": [("telco_churn.cube", "ChurnCube.kpis")],
+    "aggregate": [
+        ("telco_churn.cube", "ChurnCube.breakdowns"),
+        ("telco_churn.cube", "ChurnCube.revenue_by_status"),
+        ("telco_churn.cube", "ChurnCube.histogram"),
+        ("telco_churn.cube", "ChurnCube.box_stats"),
+    ],
+    "figures": [
+        ("telco_churn.charts", "churn_rate_bar"),
+        ("telco_churn.charts", "status_histogram_bar"),
+        ("telco_churn.charts", "status_box"),
+        ("telco_churn.charts", "tenure_charges_scatter"),
+    ],
+    "export": [("telco_churn.export", "write_export")],
+}
+
+EXPORT_FORMAT = "Parquet"
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def instrument(totals):
+    """Wrap every ``STAGES`` call so its time is added to ``totals[stage]``.
+
+    Calls nested inside another timed call (the cube's ``kpis`` inside
+    ``load_cube``, say) count once, towards the outer stage.
+    """
+    active = []
+
+    def wrap(stage, fn):
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            if active:
+                return fn(*args, **kwargs)
+            active.append(stage)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                totals[stage] += time.perf_counter() - start
+                active.pop()
+        return timed
+
+    for stage, targets in STAGES.items():
+        for module, attribute in targets:
+            owner = importlib.import_module(module)
+            *path, name = attribute.split(".")
+            for part in path:
+                owner = getattr(owner, part)
+            setattr(owner, name, wrap(stage, getattr(owner, name)))
+
+
+def run_child(n_rows):
+    """Drive the dashboard against the current ``TELCO_DATA_PATH`` and return the steps."""
+    from telco_churn.export import EXPORT_DIR
+
+    # An export left by an earlier --keep-cache run of the same selection would be reused
+    # rather than written; EXPORT_DIR is the benchmark's own (see measure)
+    for path in glob.glob(os.path.join(EXPORT_DIR, "telco_export-*")):
+        os.remove(path)
+    totals = defaultdict(float)
+    instrument(totals)
+    from streamlit.testing.v1 import AppTest
+
+    steps = []
+
+    def step(name, app, act=None):
+        totals.clear()
+        start = time.perf_counter()
+        if act is not None:
+            act()
+        app.run()
+        wall = time.perf_counter() - start
+        if app.exception:
+            raise RuntimeError(f"{name}: {app.exception[0].message}")
+        steps.append({
+            "step": name,
+            "wall_s": round(wall, 4),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "stages": {stage: round(seconds, 4) for stage, seconds in totals.items()},
+        })
+
+    app = AppTest.from_file(SCRIPT, default_timeout=3600)
+    step("first_run", app)
+    step("rerun", app)
+    gender = app.multiselect[0]
+    step("filter", app, lambda: gender.set_value(gender.options[:1]))
+    for section in app.radio[0].options:
+        step(f"section:{section}", app, lambda: app.radio[0].set_value(section))
+    step("export", app, lambda: (app.selectbox[0].set_value(EXPORT_FORMAT), app.button[0].click()))
+    return {"rows": n_rows, "steps": steps}
+
+
+def measure(n_rows, keep_cache=False):
+    """Run one size in a fresh interpreter and return its result.
+
+    The child's snapshots, cubes and exports go to its own directory under
+    ``CACHE_DIR``, removed afterwards unless ``keep_cache``.
+    """
+    cache_dir = os.path.abspath(os.path.join(CACHE_DIR, str(n_rows)))
+    env = {
+        **os.environ,
+        "TELCO_DATA_PATH": os.path.abspath(synthesize(n_rows)),
+        "TELCO_SNAPSHOT_DIR": cache_dir,
+        "TELCO_EXPORT_DIR": os.path.join(cache_dir, "exports"),
+        "PYTHONPATH": ROOT,
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    try:
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_dashboard", "--child", str(n_rows)],
+            cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+        ).stdout
+    finally:
+        if not keep_cache:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result, baseline=None):
+    before = {}
+    if baseline is not None:
+        before = {s["step"]: s["wall_s"] for s in baseline["steps"]}
+    print(f"\n{result['rows']:,} rows")
+    print(f"{'step':>28} {'wall (s)':>9} {'peak RSS (MB)':>14} {'vs before':>10}  stages (s)")
+    for s in result["steps"]:
+        change = f"{s['wall_s'] / before[s['step']]:.2f}x" if before.get(s["step"]) else "-"
+        stages = ", ".join(f"{k} {v:.3f}" for k, v in sorted(s["stages"].items(), key=lambda kv: -kv[1]))
+        print(f"{s['step']:>28} {s['wall_s']:>9.3f} {s['peak_rss_mb']:>14.0f} {change:>10}  {stages}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="7k,100k,1M,10M", help="comma separated row counts")
+    parser.add_argument("--output", default="bench_dashboard.json", help="JSON file to write")
+    parser.add_argument("--compare", help="earlier JSON output to compare the step times with")
+    parser.add_argument("--keep-cache", action="store_true",
+                        help="keep each size's snapshots and cube, so a second run measures a restart")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_child(args.child)))
+        return
+
+    baselines = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baselines = {r["rows"]: r for r in json.load(f)["results"]}
+
+    report = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "results": [],
+    }
+    for n_rows in parse_sizes(args.rows):
+        result = measure(n_rows, args.keep_cache)
+        report["results"].append(result)
+        print_result(result, baselines.get(n_rows))
+        # Written after every size so a long run leaves the finished sizes behind
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"\nwrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Cost of the download button: eager ``to_csv`` on every rerun vs ``write_export`` on request.
+
+Reports the time of serializing the whole dataset each way, the size of the
+file produced and, up to ``TRACE_MAX_ROWS``, the peak memory traced in a
+second, slower run.
+
+    python -m benchmarks.bench_export --rows 7k,100k,1M,10M
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.common import load, parse_sizes
+from telco_churn.export import EXPORT_FORMATS, write_export
+
+# The eager in-memory CSV is not worth building beyond this many rows
+EAGER_MAX_ROWS = 1_000_000
+
+# tracemalloc slows pandas' CSV writer about twentyfold
+TRACE_MAX_ROWS = 1_000_000
+
+
+def run(fn, trace):
+    """Return ``(seconds, peak MB or None, result)`` of calling ``fn``."""
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace:
+        del result
+        tracemalloc.start()
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return seconds, peak, result
+
+
+def row(n_rows, fmt, seconds, peak, size):
+    peak = "-" if peak is None else f"{peak:.1f}"
+    print(f"{n_rows:>12,} {fmt:>11} {seconds:>8.2f} {peak:>10} {size / 2**20:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="7k,100k,1M,10M")
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'format':>11} {'seconds':>8} {'peak (MB)':>10} {'file (MB)':>10}")
+    export_dir = tempfile.mkdtemp()
+    try:
+        for n_rows in parse_sizes(args.rows):
+            df = load(n_rows)
+            trace = n_rows <= TRACE_MAX_ROWS
+            if n_rows <= EAGER_MAX_ROWS:
+                seconds, peak, text = run(lambda: df.to_csv(index=False), trace)
+                row(n_rows, "to_csv", seconds, peak, len(text))
+                del text
+            for fmt in EXPORT_FORMATS:
+                def export():
+                    # Each run writes afresh rather than reusing the previous file
+                    for name in os.listdir(export_dir):
+                        os.remove(os.path.join(export_dir, name))
+                    return write_export(df, None, fmt, (n_rows, fmt), export_dir)
+                seconds, peak, path = run(export, trace)
+                row(n_rows, fmt, seconds, peak, os.path.getsize(path))
+            del df
+    finally:
+        shutil.rmtree(export_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Filter latency against row count: chained slices vs the filter engine.
+
+    python -m benchmarks.bench_filters --rows 7k,100k,1M,10M
+"""
+
+import argparse
+
+from benchmarks.common import best_of, load, parse_sizes, timed
+from telco_churn.filters import FilterEngine
+
+STATE = {
+    "Gender": ["Female"],
+    "Contract": ["Month-to-Month", "One Year"],
+    "Internet Service": [True],
+    "Age": (25, 65),
+    "Tenure": (6, 60),
+}
+
+
+def chained(df):
+    """The dashboard's original filter block."""
+    filtered_df = df.copy()
+    filtered_df = filtered_df[filtered_df["Gender"].isin(STATE["Gender"])]
+    filtered_df = filtered_df[filtered_df["Contract"].isin(STATE["Contract"])]
+    filtered_df = filtered_df[filtered_df["Internet Service"].isin(STATE["Internet Service"])]
+    filtered_df = filtered_df[filtered_df["Age"].between(*STATE["Age"])]
+    filtered_df = filtered_df[filtered_df["Tenure"].between(*STATE["Tenure"])]
+    return filtered_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="7k,100k,1M,10M")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'chained (ms)':>13} {'mask (ms)':>10} {'mask+take (ms)':>15} "
+          f"{'index build (s)':>16} {'indexed mask (ms)':>18}")
+    for n_rows in parse_sizes(args.rows):
+        df = load(n_rows)
+        engine = FilterEngine(df)
+        old = best_of(lambda: chained(df), args.repeat)
+        mask = best_of(lambda: engine.mask(STATE), args.repeat)
+        take = best_of(lambda: df.take(engine.select(STATE)), args.repeat)
+        build, indexed = timed(FilterEngine, df, indexed=True)
+        lookup = best_of(lambda: indexed.mask(STATE), args.repeat)
+        print(f"{n_rows:>12,} {old * 1e3:>13.2f} {mask * 1e3:>10.2f} {take * 1e3:>15.2f} "
+              f"{build:>16.2f} {lookup * 1e3:>18.2f}")
+        del df, engine, indexed
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Payload size and build + serialize time of the Age distribution chart.
+
+Compares the old sorted ``px.histogram`` of the raw Age column with bins
+counted from the frame and from the cube, drawn by ``status_histogram_bar``.
+
+    python -m benchmarks.bench_histogram --rows 7k,100k,1M,10M
+"""
+
+import argparse
+
+import plotly.express as px
+
+from benchmarks.common import best_of, load, parse_sizes
+from telco_churn.aggregation import churn_flag, status_histogram
+from telco_churn.charts import TEMPLATE, status_histogram_bar
+from telco_churn.cube import ChurnCube
+from telco_churn.palette import COLORS, STATUS_COLORS
+
+# The raw-data histogram is not worth serializing beyond this many rows
+LEGACY_MAX_ROWS = 1_000_000
+
+TITLE = "Age Distribution by Churn Status"
+
+
+def legacy(df):
+    """The dashboard's original chart block."""
+    fig = px.histogram(df.sort_values("ChurnStatus", ascending=False), x="Age", color="ChurnStatus",
+                       nbins=20, color_discrete_map=STATUS_COLORS, barmode='overlay', opacity=0.7)
+    fig.update_traces(opacity=0.5, selector=dict(name='Retained'),
+                      marker=dict(line=dict(color=COLORS['light'], width=1)))
+    fig.update_traces(opacity=1.0, selector=dict(name='Churned'),
+                      marker=dict(line=dict(color=COLORS['light'], width=1)))
+    fig.update_layout(template=TEMPLATE, title=dict(text=TITLE), xaxis_title="Age", yaxis_title="Count",
+                      legend=dict(orientation="h", yanchor="bottom", y=-0.3, xanchor="center", x=0.5))
+    return fig
+
+
+def measure(build, repeat):
+    spec = build().to_json()
+    return best_of(lambda: build().to_json(), repeat), len(spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="7k,100k,1M,10M")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'px (ms)':>9} {'px (KB)':>9} {'frame (ms)':>11} {'cube (ms)':>10} {'binned (KB)':>12}")
+    for n_rows in parse_sizes(args.rows):
+        df = load(n_rows)
+        before = ("-", "-")
+        if n_rows <= LEGACY_MAX_ROWS:
+            seconds, size = measure(lambda: legacy(df), args.repeat)
+            before = (f"{seconds * 1e3:.1f}", f"{size / 1024:.1f}")
+        frame, size = measure(
+            lambda: status_histogram_bar(status_histogram(df["Age"], churn_flag(df["Churn"])), "Age", TITLE),
+            args.repeat,
+        )
+        cube = ChurnCube.from_frame(df)
+        from_cube, _ = measure(lambda: status_histogram_bar(cube.histogram("Age"), "Age", TITLE), args.repeat)
+        print(f"{n_rows:>12,} {before[0]:>9} {before[1]:>9} {frame * 1e3:>11.1f} "
+              f"{from_cube * 1e3:>10.1f} {size / 1024:>12.1f}")
+        del df, cube
+
+
+if __name__ == "__main__":
+    main()
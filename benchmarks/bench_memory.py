@@ -0,0 +1,32 @@
+"""Report the per-row memory footprint of the prepared dataset.
+
+    python -m benchmarks.bench_memory [path]
+
+The "inferred" figure is what ``pd.read_csv`` produces with default type
+inference; "schema" is the frame returned by ``read_source``.
+"""
+
+import sys
+
+import pandas as pd
+
+from telco_churn.data import DATA_PATH, read_source
+
+
+def bytes_per_row(df):
+    return df.memory_usage(deep=True, index=False).sum() / max(len(df), 1)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DATA_PATH
+    inferred = bytes_per_row(pd.read_csv(path))
+    prepared = read_source(path)
+    schema = bytes_per_row(prepared)
+    print(f"inferred: {inferred:8.1f} B/row")
+    print(f"schema:   {schema:8.1f} B/row  ({inferred / schema:.1f}x smaller)")
+    usage = prepared.memory_usage(deep=True, index=False) / len(prepared)
+    print(usage.sort_values(ascending=False).head(10).round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Rerun cost of the KPI row and chart tables with and without the result cache.
+
+Replays a session that flips between a few filter states, the way analysts do.
+
+    python -m benchmarks.bench_result_cache --rows 7k,1M,10M
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import load, parse_sizes
+from telco_churn.cache import ResultCache
+from telco_churn.cube import ChurnCube
+from telco_churn.filters import state_key
+from telco_churn.streaming import CHURN_DIMENSIONS
+
+STATES = [
+    {"Gender": [], "Contract": [], "Internet Service": [], "Age": None, "Tenure": None},
+    {"Gender": ["Female"], "Contract": [], "Internet Service": [], "Age": None, "Tenure": None},
+    {"Gender": ["Male"], "Contract": ["Month-to-Month"], "Internet Service": [], "Age": None, "Tenure": None},
+    {"Gender": [], "Contract": ["One Year", "Two Year"], "Internet Service": [True], "Age": (30, 60), "Tenure": None},
+    {"Gender": [], "Contract": [], "Internet Service": [], "Age": (19, 30), "Tenure": (1, 12)},
+    {"Gender": ["Female"], "Contract": ["Month-to-Month"], "Internet Service": [True], "Age": (25, 65), "Tenure": (6, 60)},
+]
+
+
+def compute(cube, state):
+    # A fresh state would find no cached masks in the cube either
+    cube._masks.clear()
+    return {
+        "kpis": cube.kpis(state),
+        "churn_tables": cube.breakdowns(CHURN_DIMENSIONS, state),
+        "revenue": cube.revenue_by_status(state),
+    }
+
+
+def replay(cube, session, cache=None):
+    start = time.perf_counter()
+    for state in session:
+        if cache is None:
+            compute(cube, state)
+        else:
+            cache.get_or_compute(state_key(state), lambda: compute(cube, state))
+    return (time.perf_counter() - start) / len(session)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="7k,1M,10M")
+    parser.add_argument("--reruns", type=int, default=200)
+    parser.add_argument("--budget-mb", type=float, default=64)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    session = [rng.choice(STATES) for _ in range(args.reruns)]
+    print(f"{'rows':>12} {'uncached (ms)':>14} {'cached (ms)':>12} {'hit rate':>9} {'entry (KB)':>11}")
+    for n_rows in parse_sizes(args.rows):
+        cube = ChurnCube.from_frame(load(n_rows))
+        uncached = replay(cube, session)
+        cache = ResultCache(args.budget_mb)
+        cached = replay(cube, session, cache)
+        stats = cache.stats()
+        print(f"{n_rows:>12,} {uncached * 1e3:>14.2f} {cached * 1e3:>12.2f} "
+              f"{stats['hit_rate']:>9.1%} {stats['bytes'] / stats['entries'] / 1024:>11.1f}")
+
+    # A budget of two entries keeps evicting as the session cycles through six states
+    cache = ResultCache(budget_mb=2.5 * stats["bytes"] / stats["entries"] / 2**20)
+    replay(cube, session, cache)
+    print(f"tight budget: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
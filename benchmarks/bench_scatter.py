@@ -0,0 +1,56 @@
+"""Payload size and build + serialize time of the Tenure vs Monthly Charges chart.
+
+Compares the old ``px.scatter`` of every customer with ``tenure_charges_scatter``.
+
+    python -m benchmarks.bench_scatter --rows 7k,100k,1M,10M
+"""
+
+import argparse
+
+import plotly.express as px
+
+from benchmarks.common import best_of, load, parse_sizes
+from telco_churn.charts import TEMPLATE, tenure_charges_scatter
+from telco_churn.palette import COLORS, STATUS_COLORS
+
+# The SVG scatter is not worth serializing beyond this many points
+LEGACY_MAX_ROWS = 1_000_000
+
+
+def legacy(df):
+    """The dashboard's original chart block."""
+    fig = px.scatter(df, x="Tenure", y="MonthlyCharges", color="ChurnStatus",
+                     title="Customer Tenure vs Monthly Charges", color_discrete_map=STATUS_COLORS,
+                     opacity=0.7, size_max=15)
+    fig.update_traces(marker=dict(line=dict(color=COLORS['light'], width=1)))
+    fig.update_layout(template=TEMPLATE, xaxis_title="Tenure (Months)", yaxis_title="Monthly Charges ($)")
+    return fig
+
+
+def measure(build, repeat):
+    spec = build().to_json()
+    return best_of(lambda: build().to_json(), repeat), len(spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="7k,100k,1M,10M")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>12} {'mode':>8} {'before (ms)':>12} {'before (KB)':>12} {'after (ms)':>11} {'after (KB)':>11}")
+    for n_rows in parse_sizes(args.rows):
+        df = load(n_rows)
+        before = ("-", "-")
+        if n_rows <= LEGACY_MAX_ROWS:
+            seconds, size = measure(lambda: legacy(df), args.repeat)
+            before = (f"{seconds * 1e3:.1f}", f"{size / 1024:.1f}")
+        seconds, size = measure(lambda: tenure_charges_scatter(df), args.repeat)
+        mode = "points" if tenure_charges_scatter(df).data[0].type == "scattergl" else "density"
+        print(f"{n_rows:>12,} {mode:>8} {before[0]:>12} {before[1]:>12} "
+              f"{seconds * 1e3:>11.1f} {size / 1024:>11.1f}")
+        del df
+
+
+if __name__ == "__main__":
+    main()
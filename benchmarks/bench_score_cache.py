@@ -0,0 +1,102 @@
+"""Rescoring a monthly refresh through the score cache against scoring every row.
+
+Builds a month of distinct customers (a synthetic dataset with a unique
+Population per row) and the next month, in which a ``--changed`` fraction of
+them stayed another month (one more month of tenure and charges). Scores the
+first month into an empty cache, then the next month without it and with a
+copy of that cache, ``--repeat`` times each, and reports the fastest runs' hit
+rate, the time the run estimates it saved and the measured difference. The
+difference is within the noise of a whole run once parsing and formatting
+dominate, so the second table times just the step the cache replaces: the
+encoded month through the model, or through a freshly loaded cache.
+
+    python -m benchmarks.bench_score_cache --rows 100k,1M --changed 0.05
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import SCRATCH_DIR, best_of, parse_sizes, synthesize
+from telco_churn.data import read_csv
+from telco_churn.model import MODEL_PATH, load_model, save_model, train
+from telco_churn.score_cache import ScoreCache, cache_path
+from telco_churn.scoring import score_file
+
+
+def months(n_rows, changed, seed=0):
+    """Write (once) and return the paths of two consecutive months of ``n_rows`` customers."""
+    first = os.path.join(SCRATCH_DIR, f"month_{n_rows}_0.csv")
+    second = os.path.join(SCRATCH_DIR, f"month_{n_rows}_{changed}.csv")
+    if not os.path.exists(first) or not os.path.exists(second):
+        df = pd.read_csv(synthesize(n_rows))
+        df["Population"] = np.arange(1, len(df) + 1)
+        df.to_csv(first, index=False)
+        stayed = np.random.default_rng(seed).random(len(df)) < changed
+        df.loc[stayed, "Tenure in Months"] += 1
+        df.loc[stayed, "Total Charges"] += df.loc[stayed, "Monthly Charge"]
+        df.to_csv(second, index=False)
+    return first, second
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="100k,1M", help="comma separated customer counts")
+    parser.add_argument("--changed", type=float, default=0.05, help="fraction of customers changed in month two")
+    parser.add_argument("--workers", type=int, default=0, help="scoring processes; 0 scores in-process")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of month two, fastest reported")
+    args = parser.parse_args()
+
+    model_path = MODEL_PATH
+    try:
+        load_model(model_path)
+    except FileNotFoundError:
+        model_path = os.path.join(SCRATCH_DIR, "gradient_boosting.pkl")
+        save_model(train()[0], model_path)
+
+    model = load_model(model_path)
+    stages = []
+    print(f"{'rows':>10} {'run':>17} {'seconds':>8} {'hit rate':>9} {'est. saved s':>13} {'measured s':>11}")
+    for n_rows in parse_sizes(args.rows):
+        first, second = months(n_rows, args.changed)
+        with tempfile.TemporaryDirectory() as scratch:
+            output = os.path.join(scratch, "scores.csv")
+
+            def run(path, cache_dir):
+                return score_file(path, output, model_path, args.workers, cache_dir=cache_dir)
+
+            primed = os.path.join(scratch, "primed")
+            cold = run(first, primed)
+
+            def warm_run():
+                cache_dir = os.path.join(scratch, "warm")
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                shutil.copytree(primed, cache_dir)
+                return run(second, cache_dir)
+
+            uncached = min((run(second, None) for _ in range(args.repeat)), key=lambda stats: stats["seconds"])
+            warm = min((warm_run() for _ in range(args.repeat)), key=lambda stats: stats["seconds"])
+            for label, stats in (("month 1, cold", cold), ("month 2, no cache", uncached),
+                                 ("month 2, cached", warm)):
+                # Against scoring the same month without the cache
+                measured = uncached["seconds"] - stats["seconds"] if stats is warm else None
+                print(f"{n_rows:>10,} {label:>17} {stats['seconds']:>8.2f} "
+                      f"{stats.get('hit_rate', 0):>9.1%} {stats.get('saved_seconds', 0):>13.2f} "
+                      f"{'' if measured is None else f'{measured:.2f}':>11}")
+
+            X = model.encode(read_csv(second))
+            stages.append((n_rows, best_of(lambda: model.predict_proba_encoded(X), args.repeat),
+                           best_of(lambda: ScoreCache(cache_path(model.version, primed)).predict_proba(model, X),
+                                   args.repeat)))
+
+    print(f"\n{'rows':>10} {'model s':>8} {'cached s':>9} {'speedup':>8}")
+    for n_rows, uncached, cached in stages:
+        print(f"{n_rows:>10,} {uncached:>8.3f} {cached:>9.3f} {uncached / cached:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
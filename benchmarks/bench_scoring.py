@@ -0,0 +1,56 @@
+"""Throughput and memory of ``score_file`` by number of worker processes.
+
+Trains the workflow's model into a scratch file, then scores each dataset
+size with each worker count in a fresh interpreter and reports rows per
+second and the largest resident set of the parent or any worker.
+
+    python -m benchmarks.bench_scoring --rows 1M,10M --workers 0,1,2,4
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import SCRATCH_DIR, parse_sizes, synthesize
+from telco_churn.model import save_model, train
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="1M", help="comma separated row counts")
+    parser.add_argument("--workers", default=f"0,1,{os.cpu_count()}", help="comma separated worker counts")
+    args = parser.parse_args()
+
+    model_path = os.path.join(SCRATCH_DIR, "gradient_boosting.pkl")
+    save_model(train()[0], model_path)
+
+    print(f"{'rows':>12} {'workers':>8} {'seconds':>8} {'rows/s':>10} {'max RSS (MB)':>13}")
+    for n_rows in parse_sizes(args.rows):
+        source = synthesize(n_rows)
+        for workers in sorted({int(w) for w in args.workers.split(",")}):
+            with tempfile.TemporaryDirectory() as scratch:
+                start = time.perf_counter()
+                # A fresh interpreter per run, reporting its own peak and its workers'
+                out = subprocess.run(
+                    [sys.executable, "-c",
+                     "import resource, sys; from telco_churn.scoring import score_file; "
+                     "score_file(*sys.argv[1:4], workers=int(sys.argv[4])); "
+                     "print(max(resource.getrusage(who).ru_maxrss for who in "
+                     "(resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)))",
+                     source, os.path.join(scratch, "scores.csv"), model_path, str(workers)],
+                    cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT}, check=True,
+                    capture_output=True, text=True,
+                ).stdout
+                seconds = time.perf_counter() - start
+            # ru_maxrss is in kilobytes on Linux
+            peak = int(out.strip().splitlines()[-1]) / 1024
+            print(f"{n_rows:>12,} {workers:>8} {seconds:>8.2f} {n_rows / seconds:>10,.0f} {peak:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Load generator for the scoring service: latency and throughput by concurrency.
+
+Starts ``telco_churn.service`` once per ``--max-batch`` setting (1 turns
+micro-batching off) unless ``--url`` points at a running one, then has
+``concurrency`` client threads each post one customer at a time over a
+keep-alive connection for ``--duration`` seconds. Reports the client-side
+p50/p99 latency and requests per second, and the service's mean batch size.
+
+    python -m benchmarks.bench_service --concurrency 1,8,32 --max-batch 1,256
+    python -m benchmarks.bench_service --url http://127.0.0.1:8502 --concurrency 16
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import SCRATCH_DIR
+from telco_churn.model import ML_READY_PATH, MODEL_PATH, load_model, save_model, train
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def records(path=ML_READY_PATH):
+    """Return the customers of ``path`` as JSON request bodies."""
+    rows = json.loads(pd.read_csv(path).to_json(orient="records"))
+    return [json.dumps(row).encode() for row in rows]
+
+
+def client(url, bodies, offset, stop, latencies):
+    parts = urllib.parse.urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port)
+    i = offset
+    while not stop.is_set():
+        start = time.perf_counter()
+        conn.request("POST", "/score", bodies[i % len(bodies)], {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"service answered {response.status}")
+        latencies.append(time.perf_counter() - start)
+        i += 1
+    conn.close()
+
+
+def run_load(url, bodies, concurrency, duration):
+    stop = threading.Event()
+    latencies = [[] for _ in range(concurrency)]
+    threads = [
+        threading.Thread(target=client, args=(url, bodies, i * 997, stop, latencies[i]))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    latencies = np.concatenate([np.asarray(l) for l in latencies])
+    return {
+        "requests": len(latencies),
+        "p50_ms": float(np.percentile(latencies, 50) * 1e3),
+        "p99_ms": float(np.percentile(latencies, 99) * 1e3),
+        "rps": len(latencies) / seconds,
+    }
+
+
+def get(url, path):
+    with urllib.request.urlopen(url + path, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def start_service(model_path, max_batch):
+    """Start the service on a free port and return ``(process, url)`` once it answers."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "telco_churn.service", "--port", str(port),
+         "--model", model_path, "--max-batch", str(max_batch)],
+        cwd=ROOT, env={**os.environ, "PYTHONPATH": ROOT}, stdout=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(300):
+        try:
+            get(url, "/health")
+            return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("the service did not start")
+
+
+def report(label, concurrency, result, stats):
+    batch = stats.get("mean_batch_rows")
+    print(f"{label:>12} {concurrency:>6} {result['requests']:>9,} {result['p50_ms']:>8.2f} "
+          f"{result['p99_ms']:>8.2f} {result['rps']:>8.0f} {batch or 0:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="running service to load instead of starting one")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma separated client counts")
+    parser.add_argument("--max-batch", default="1,256", help="service settings to compare")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per run")
+    args = parser.parse_args()
+
+    bodies = records()
+    concurrencies = [int(c) for c in args.concurrency.split(",")]
+    print(f"{'max batch':>12} {'conns':>6} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8} "
+          f"{'mean batch':>11}")
+    if args.url:
+        for concurrency in concurrencies:
+            result = run_load(args.url, bodies, concurrency, args.duration)
+            report("-", concurrency, result, get(args.url, "/stats"))
+        return
+
+    model_path = MODEL_PATH
+    try:
+        load_model(model_path)
+    except FileNotFoundError:
+        model_path = os.path.join(SCRATCH_DIR, "gradient_boosting.pkl")
+        save_model(train()[0], model_path)
+    for max_batch in [int(b) for b in args.max_batch.split(",")]:
+        for concurrency in concurrencies:
+            # A fresh service per run, so that its batch statistics are this run's
+            process, url = start_service(model_path, max_batch)
+            try:
+                result = run_load(url, bodies, concurrency, args.duration)
+                report(str(max_batch), concurrency, result, get(url, "/stats"))
+            finally:
+                process.terminate()
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Startup budget of the dashboard: cold interpreter start, first run and reruns.
+
+Each measurement runs in a fresh interpreter, as after a restart on Render:
+
+* ``imports``: importing everything the dashboard imports at the top (Plotly
+  and ``telco_churn.charts`` are imported by the chart builders, within
+  ``first_run``);
+* ``first_run``: the first headless run of the script, loading the data,
+  indexes and cube and building the default view;
+* ``rerun``: a further run in the same process, as every interaction and
+  every later session pays it.
+
+``warm_up`` in ``telco_churn.serve`` pays ``imports`` and ``first_run`` before
+the server binds, leaving the first visitor with ``rerun``. The run fails
+when any median is over ``STARTUP_BUDGET``.
+
+    python -m benchmarks.bench_startup --repeat 3
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "telco_churn_dashboard.py")
+
+# Seconds, median of the runs, on the 7k-row dataset
+STARTUP_BUDGET = {"imports": 2.0, "first_run": 6.0, "rerun": 0.5}
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import streamlit, pandas
+import telco_churn.cache, telco_churn.cube, telco_churn.data, telco_churn.export, telco_churn.filters
+import telco_churn.palette, telco_churn.shared, telco_churn.streaming, telco_churn.styles
+imports = time.perf_counter() - start
+
+from streamlit.testing.v1 import AppTest
+times = {"imports": imports}
+for name in ("first_run", "rerun"):
+    start = time.perf_counter()
+    app = AppTest.from_file(sys.argv[1], default_timeout=600).run()
+    times[name] = time.perf_counter() - start
+    assert not app.exception, app.exception
+print(json.dumps(times))
+"""
+
+
+def measure():
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD, SCRIPT], cwd=ROOT, check=True, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": ROOT},
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters to start")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.repeat)]
+    print(f"{'stage':>10} {'median (s)':>11} {'max (s)':>8} {'budget (s)':>11}")
+    over = []
+    for stage, budget in STARTUP_BUDGET.items():
+        times = [r[stage] for r in runs]
+        median = statistics.median(times)
+        print(f"{stage:>10} {median:>11.3f} {max(times):>8.3f} {budget:>11.1f}"
+              f"{'  OVER' if median > budget else ''}")
+        if median > budget:
+            over.append(stage)
+    if over:
+        sys.exit(f"over the startup budget: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Flat tree ensemble against scikit-learn's ``predict_proba`` by batch size.
+
+Encodes a synthetic dataset once, then times on its first ``n`` rows one
+scikit-learn call over the whole batch, the flat ``TreeEnsemble`` and
+``ChurnModel.predict_proba_encoded`` (flat up to ``FLAT_MAX_ROWS``,
+scikit-learn in blocks above), and reports the largest difference between
+the flat and scikit-learn probabilities.
+
+    python -m benchmarks.bench_trees --rows 1,10,100,1k,10k,100k,1M
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from benchmarks.common import SCRATCH_DIR, best_of, parse_sizes, synthesize
+from telco_churn.data import read_csv
+from telco_churn.model import MODEL_PATH, load_model, save_model, train
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="1,10,100,1k,10k,100k,1M", help="comma separated batch sizes")
+    args = parser.parse_args()
+
+    try:
+        model = load_model(MODEL_PATH)
+    except FileNotFoundError:
+        model = train()[0]
+        save_model(model, os.path.join(SCRATCH_DIR, "gradient_boosting.pkl"))
+    sizes = parse_sizes(args.rows)
+    X = model.encode(read_csv(synthesize(max(sizes))))
+
+    print(f"{'rows':>10} {'sklearn ms':>11} {'flat ms':>9} {'model ms':>9} {'flat x':>7} {'model x':>8} "
+          f"{'max |diff|':>11}")
+    for n_rows in sizes:
+        batch = X[:n_rows]
+        # Enough repeats for about a second of the fastest small batches
+        repeat = max(3, min(200, 100_000 // n_rows))
+        reference = best_of(lambda: model.estimator.predict_proba(batch), repeat)
+        flat = best_of(lambda: model.trees.predict_proba(batch), repeat)
+        dispatched = best_of(lambda: model.predict_proba_encoded(batch), repeat)
+        diff = np.abs(model.trees.predict_proba(batch) - model.estimator.predict_proba(batch)).max()
+        print(f"{n_rows:>10,} {reference * 1e3:>11.3f} {flat * 1e3:>9.3f} {dispatched * 1e3:>9.3f} "
+              f"{reference / flat:>7.2f} {reference / dispatched:>8.2f} {diff:>11.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Shared helpers for the benchmark scripts."""
+
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from telco_churn.data import DATA_PATH, load_dataset
+
+SCRATCH_DIR = "./benchmarks/.data"
+
+
+def synthesize(n_rows, path=None, source=DATA_PATH, chunk_rows=500_000, seed=0):
+    """Write an ``n_rows`` CSV with the ml-ready schema by resampling ``source``.
+
+    Rows are written in chunks so that 10M-row files can be produced without
+    holding them in memory. Existing files of the right name are reused.
+    """
+    if path is None:
+        path = os.path.join(SCRATCH_DIR, f"ml_ready_telco_{n_rows}.csv")
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    base = pd.read_csv(source)
+    rng = np.random.default_rng(seed)
+    tmp = f"{path}.tmp"
+    written = 0
+    while written < n_rows:
+        size = min(chunk_rows, n_rows - written)
+        chunk = base.iloc[rng.integers(0, len(base), size)]
+        chunk.to_csv(tmp, mode="a", header=written == 0, index=False)
+        written += size
+    os.replace(tmp, path)
+    return path
+
+
+def load(n_rows):
+    """Synthesize (once) and load an ``n_rows`` dataset through the snapshot cache."""
+    return load_dataset(synthesize(n_rows), os.path.join(SCRATCH_DIR, "cache"))
+
+
+def best_of(fn, repeat=5):
+    """Return the fastest of ``repeat`` timings of ``fn()`` in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def timed(fn, *args, **kwargs):
+    """Return ``(seconds, result)`` for a single call of ``fn``."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def parse_sizes(text):
+    """Parse ``"7k,1M,10M"`` style row counts."""
+    sizes = []
+    for item in text.split(","):
+        item = item.strip().lower()
+        scale = {"k": 1_000, "m": 1_000_000}.get(item[-1:], 1)
+        sizes.append(int(float(item.rstrip("km")) * scale))
+    return sizes
@@ -0,0 +1 @@
+"""Data, analytics and modelling helpers for the Telco churn dashboard."""
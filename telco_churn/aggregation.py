@@ -0,0 +1,179 @@
+"""Vectorized churn-rate aggregation shared by the dashboard, the cube and the streaming loader.
+
+Every churn chart counts churned and total customers per value of one
+dimension. ``churn_breakdowns`` does that for any number of dimensions at once:
+the churn flag is an integer array computed once, each dimension becomes dense
+group codes, and every count or sum is one ``np.bincount``. Nothing runs
+Python code per group or per row, unlike the ``agg`` lambdas it replaces.
+``bin2d`` applies the same counting to a 2D grid for the density charts, and
+``status_histogram`` to the bins of a histogram.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Widest integer range coded by offset instead of by factorizing
+MAX_DENSE_GROUPS = 65_536
+
+# Bin widths a histogram may use, times a power of ten (as plotly.js autobins)
+NICE_BIN_STEPS = (1, 2, 5, 10)
+
+
+def churn_flag(churn):
+    """Return ``churn == "Yes"`` as an int8 array, read off the category codes when possible."""
+    if isinstance(churn.dtype, pd.CategoricalDtype):
+        # The extra slot maps code -1 (missing) to "not churned"
+        lookup = np.append(churn.cat.categories == "Yes", False).astype(np.int8)
+        return lookup[churn.cat.codes.to_numpy()]
+    return (churn.to_numpy() == "Yes").astype(np.int8)
+
+
+def group_codes(series):
+    """Return ``(codes, labels)`` for a dimension column, with missing values coded -1.
+
+    Labels are sorted like ``groupby(...).sort_index()``: categoricals in
+    category order, everything else by value. Labels may include values no
+    row has; ``breakdown_table`` drops their empty groups.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), np.asarray(series.cat.categories)
+    values = series.to_numpy()
+    if values.dtype == bool:
+        return values.view(np.uint8), np.array([False, True])
+    if values.dtype.kind in "iu" and len(values):
+        # Small integer domains (referrals, scores) are their own codes once shifted to zero
+        low, high = values.min(), values.max()
+        if int(high) - int(low) < MAX_DENSE_GROUPS:
+            return values - low, np.arange(low, high + 1, dtype=values.dtype)
+    codes, labels = pd.factorize(values, sort=True)
+    return codes, np.asarray(labels)
+
+
+def breakdown_table(dim, labels, churned, total, sums=None):
+    """Return the tidy ``[dim, Churn, Total, Churn_Rate, *sums]`` frame of the non-empty groups."""
+    table = pd.DataFrame({dim: labels, "Churn": churned, "Total": total, **(sums or {})})
+    table = table[table["Total"] > 0].reset_index(drop=True)
+    table.insert(3, "Churn_Rate", (table["Churn"] / table["Total"] * 100).round(1))
+    return table
+
+
+def churn_breakdowns(df, dims, flag=None, count=None, sums=(), mask=None, codes=None):
+    """Return ``{dim: breakdown_table}`` for every dimension in ``dims``.
+
+    ``flag`` is the 0/1 churn flag per row and defaults to
+    ``churn_flag(df["Churn"])``. For pre-aggregated rows such as cube cells,
+    ``flag`` holds the churned and ``count`` the total customers per row.
+    The totals of the ``sums`` columns are added per group. ``mask``
+    restricts the rows, and ``codes`` may supply precomputed ``group_codes``
+    per dimension.
+    """
+    codes = codes or {}
+    if flag is None:
+        flag = churn_flag(df["Churn"])
+    values = {col: df[col].to_numpy(dtype=np.float64) for col in sums}
+    if mask is not None:
+        flag = flag[mask]
+        count = count[mask] if count is not None else None
+        values = {col: column[mask] for col, column in values.items()}
+
+    tables = {}
+    for dim in dims:
+        dim_codes, labels = codes[dim] if dim in codes else group_codes(df[dim])
+        if mask is not None:
+            dim_codes = dim_codes[mask]
+        n_groups = len(labels)
+        # Group 0 collects the rows missing the dimension and is dropped
+        groups = dim_codes.astype(np.intp)
+        groups += 1
+
+        def tally(weights):
+            return np.bincount(groups, weights=weights, minlength=n_groups + 1)[1:]
+
+        if count is None:
+            # One integer bincount over (group, churned) pairs gives both counts
+            pairs = np.bincount(groups * 2 + flag, minlength=2 * (n_groups + 1)).reshape(-1, 2)[1:]
+            churned, total = pairs[:, 1], pairs.sum(axis=1)
+        else:
+            churned, total = tally(flag).astype(np.int64), tally(count).astype(np.int64)
+        tables[dim] = breakdown_table(dim, labels, churned, total,
+                                      {col: tally(column) for col, column in values.items()})
+    return tables
+
+
+def bin2d(x, y, flag, x_width, y_width):
+    """Count customers and churned customers per cell of a 2D grid.
+
+    Cells are aligned to multiples of the widths, so grids from different
+    selections line up. Returns ``(x_starts, y_starts, totals, churned)``
+    with the counts shaped ``(len(y_starts), len(x_starts))`` like a
+    heatmap's ``z``. Rows missing either value are left out.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    present = ~(np.isnan(x) | np.isnan(y))
+    if not present.all():
+        x, y, flag = x[present], y[present], np.asarray(flag)[present]
+    if not len(x):
+        empty = np.zeros((0, 0), dtype=np.int64)
+        return np.array([]), np.array([]), empty, empty
+
+    xi = np.floor(x / x_width).astype(np.int64)
+    yi = np.floor(y / y_width).astype(np.int64)
+    x0, y0 = xi.min(), yi.min()
+    nx, ny = int(xi.max() - x0) + 1, int(yi.max() - y0) + 1
+    cells = (yi - y0) * nx + (xi - x0)
+    totals = np.bincount(cells, minlength=nx * ny).reshape(ny, nx)
+    churned = np.bincount(cells, weights=flag, minlength=nx * ny).astype(np.int64).reshape(ny, nx)
+    return (x0 + np.arange(nx)) * x_width, (y0 + np.arange(ny)) * y_width, totals, churned
+
+
+def histogram_bins(low, high, nbins, integer=False):
+    """Return ``(start, width, count)`` of the bins covering ``[low, high]``.
+
+    Mirrors plotly.js ``nbins`` autobinning: the width is rounded up to
+    1, 2 or 5 times a power of ten, the first edge is a multiple of the
+    width, and integer data get bins at least 1 wide with edges half-way
+    between integers.
+    """
+    rough = (high - low) / nbins if high > low else 1.0
+    base = 10.0 ** np.floor(np.log10(rough))
+    width = base * next(step for step in NICE_BIN_STEPS if step >= rough / base - 1e-9)
+    if integer:
+        # Bins narrower than the spacing of the data would alternate with empty ones
+        width = max(width, 1.0)
+    start = np.floor(low / width) * width
+    if integer:
+        start -= 0.5
+        if start + width <= low:
+            start += width
+    count = int(np.floor((high - start) / width)) + 1
+    return float(start), float(width), count
+
+
+def status_histogram(values, flag, count=None, nbins=20):
+    """Return churned and retained customers per histogram bin of ``values``.
+
+    ``flag`` and ``count`` follow ``churn_breakdowns``: per-row 0/1 churn
+    flags, or churned and total customers per pre-aggregated row. Returns a
+    ``[start, end, Churned, Retained]`` frame with one row per bin.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    flag = np.asarray(flag, dtype=np.float64)
+    count = np.ones(len(values)) if count is None else np.asarray(count, dtype=np.float64)
+    present = ~np.isnan(values) & (count > 0)
+    if not present.all():
+        values, flag, count = values[present], flag[present], count[present]
+    if not len(values):
+        return pd.DataFrame({col: pd.Series(dtype=np.float64 if col in ("start", "end") else np.int64)
+                             for col in ("start", "end", "Churned", "Retained")})
+
+    start, width, n_bins = histogram_bins(
+        values.min(), values.max(), nbins, integer=bool((values == np.round(values)).all())
+    )
+    bins = np.minimum(((values - start) // width).astype(np.intp), n_bins - 1)
+    total = np.bincount(bins, weights=count, minlength=n_bins).astype(np.int64)
+    churned = np.bincount(bins, weights=flag, minlength=n_bins).astype(np.int64)
+    edges = start + np.arange(n_bins + 1) * width
+    return pd.DataFrame({
+        "start": edges[:-1], "end": edges[1:], "Churned": churned, "Retained": total - churned,
+    })
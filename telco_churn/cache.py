@@ -0,0 +1,137 @@
+"""In-process LRU cache for per-filter-state dashboard results and figures.
+
+Analysts flip between a handful of filter combinations, and every rerun with a
+state seen before would otherwise recompute the same KPIs and chart tables.
+``ResultCache`` keeps those results keyed on ``filters.state_key`` and evicts
+the least recently used entries once their estimated size passes a memory
+budget. One cache is shared by all sessions through ``st.cache_resource``, so
+access is guarded by a lock, and cached values must be treated as read-only.
+
+``input_key`` digests the inputs a chart declares, so that its cached figure
+is reused whenever those inputs are unchanged, whatever else changed.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BUDGET_MB = float(os.environ.get("TELCO_RESULT_CACHE_MB", 64))
+
+# Budget of the dashboard's cache of serialized Plotly figures
+FIGURE_CACHE_MB = float(os.environ.get("TELCO_FIGURE_CACHE_MB", 128))
+
+
+def sizeof(value):
+    """Estimate the memory held by a cached value in bytes."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _update_digest(digest, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(b"{")
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode())
+            _update_digest(digest, value[key])
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"(")
+        for item in value:
+            _update_digest(digest, item)
+        digest.update(b")")
+    else:
+        digest.update(repr(value).encode())
+    digest.update(b";")
+
+
+def input_key(*inputs):
+    """Return a digest of frames, arrays, containers and scalars that changes whenever any of them does."""
+    digest = hashlib.blake2b(digest_size=16)
+    for value in inputs:
+        _update_digest(digest, value)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Thread-safe LRU mapping bounded by the estimated size of its values."""
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget = int(budget_mb * 2**20)
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for ``key`` or ``None``, counting a hit or a miss."""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store ``value`` under ``key``, evicting the oldest entries beyond the budget."""
+        size = sizeof(value)
+        with self._lock:
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            if size > self.budget:
+                # A single result larger than the whole budget is not worth keeping
+                return value
+            self.entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.budget:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Return the hit/miss counters and current occupancy."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "budget": self.budget,
+            }
@@ -0,0 +1,230 @@
+"""Plotly figure builders and the shared dark theme of the dashboard.
+
+The theme every chart used to repeat in its own ``update_layout`` call is
+registered once as the ``telco_dark`` template. ``churn_rate_bar`` builds the
+churn-rate bar charts (gender, age group, contract, internet, phone, referrals,
+satisfaction) from a ``[dim, Churn, Total, Churn_Rate]`` table in a single
+``go.Figure`` call: the value labels are passed as one annotation list instead
+of being added, and the figure re-validated, one ``add_annotation`` at a time.
+
+``status_histogram_bar`` draws a histogram binned on the server (see
+``aggregation.status_histogram``) as bar traces of counts, so the raw values
+never reach the browser, and ``status_box`` draws box plots from the
+statistics of ``ChurnCube.box_stats``. ``tenure_charges_scatter`` draws small selections as WebGL points and larger
+ones as a server-side binned grid, so its payload stops growing with the
+number of customers.
+"""
+
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from telco_churn.aggregation import bin2d, churn_flag
+from telco_churn.palette import CHURN_RATE_SCALE, COLORS, STATUS_COLORS
+
+TEMPLATE = "telco_dark"
+
+# Above this many customers the scatter is drawn as a binned density grid instead of points
+SCATTER_MAX_POINTS = int(os.environ.get("TELCO_SCATTER_MAX_POINTS", 50_000))
+
+# Density grid cell size: 3 months of tenure by $5 of monthly charges
+DENSITY_BIN_WIDTHS = (3, 5.0)
+
+
+def _register_template():
+    template = go.layout.Template(pio.templates["plotly_dark"])
+    template.layout.update(
+        font=dict(family="Inter", size=14, color=COLORS['primary']),
+        paper_bgcolor=COLORS['background'],
+        plot_bgcolor=COLORS['background'],
+        title=dict(font=dict(size=20, color=COLORS['primary']), x=0.5),
+        legend=dict(bgcolor=COLORS['surface'], font=dict(color=COLORS['primary'])),
+    )
+    pio.templates[TEMPLATE] = template
+
+
+_register_template()
+
+
+def value_labels(x, y, text, offset_small=2, offset_large=5):
+    """Return boxed labels above bars, nudged further up on the tallest bars."""
+    y = np.asarray(y, dtype=np.float64)
+    offsets = np.where(y < y.max() * 0.7, offset_small, offset_large) if len(y) else y
+    return [
+        dict(
+            x=xi, y=yi + offset, text=label, showarrow=False,
+            font=dict(size=12, color=COLORS['primary']),
+            bgcolor=COLORS['surface'], bordercolor=COLORS['border'], borderwidth=1, opacity=0.9,
+        )
+        for xi, yi, offset, label in zip(x, y.tolist(), offsets.tolist(), text)
+    ]
+
+
+def churn_rate_bar(table, dim, title, text_position="outside", bargap=0.2, y_max=None,
+                   labels=True, highlight_max=False):
+    """Return the themed churn-rate bar chart of a breakdown table.
+
+    ``labels`` adds a boxed value label above every bar; ``highlight_max``
+    instead points an arrow at the highest churn rate. ``y_max`` fixes the
+    top of the y axis to leave room for the labels.
+    """
+    x = table[dim].tolist()
+    rates = table["Churn_Rate"].tolist()
+
+    annotations = []
+    if labels:
+        annotations = value_labels(x, rates, [f"{rate}%" for rate in rates])
+    if highlight_max and rates:
+        peak = int(np.argmax(rates))
+        annotations.append(dict(
+            x=x[peak], y=rates[peak], text=f"Highest churn: {rates[peak]:.1f}%",
+            showarrow=True, arrowhead=1, yshift=10,
+            font=dict(color=COLORS['primary'], size=12), bgcolor=COLORS['surface'],
+        ))
+
+    bar = go.Bar(
+        x=x, y=rates, text=rates, name="", showlegend=False,
+        texttemplate='%{text}%', textposition=text_position,
+        marker=dict(color=rates, coloraxis="coloraxis", line=dict(color=COLORS['light'], width=1)),
+        hovertemplate=f"{dim}=%{{x}}<br>Churn_Rate=%{{marker.color}}<extra></extra>",
+    )
+    layout = dict(
+        template=TEMPLATE,
+        title=dict(text=title),
+        xaxis=dict(title=dict(text=dim)),
+        yaxis=dict(title=dict(text="Churn Rate (%)")),
+        coloraxis=dict(colorscale=CHURN_RATE_SCALE, colorbar=dict(title=dict(text="Churn_Rate"))),
+        showlegend=False,
+        barmode="relative",
+        bargap=bargap,
+        annotations=annotations,
+    )
+    if y_max is not None:
+        layout["yaxis"]["range"] = [0, y_max]
+    return go.Figure(data=[bar], layout=layout)
+
+
+def status_histogram_bar(table, dim, title):
+    """Return the overlaid churned/retained histogram of a ``status_histogram`` table."""
+    centers = ((table["start"] + table["end"]) / 2).tolist()
+    widths = (table["end"] - table["start"]).tolist()
+    # Retained first so the churned bars are drawn on top, as the sorted px.histogram did
+    traces = [
+        go.Bar(
+            x=centers, y=table[label].tolist(), width=widths, name=label, legendgroup=label,
+            customdata=table[["start", "end"]].to_numpy(),
+            marker=dict(color=STATUS_COLORS[label], line=dict(color=COLORS['light'], width=1)),
+            opacity=opacity,
+            hovertemplate=f"ChurnStatus={label}<br>{dim}=%{{customdata[0]}}-%{{customdata[1]}}"
+                          "<br>count=%{y}<extra></extra>",
+        )
+        for label, opacity in (("Retained", 0.5), ("Churned", 1.0))
+    ]
+    layout = dict(
+        template=TEMPLATE,
+        title=dict(text=title),
+        xaxis=dict(title=dict(text=dim)),
+        yaxis=dict(title=dict(text="Count")),
+        barmode="overlay",
+        bargap=0,
+        legend=dict(title=dict(text="ChurnStatus"), orientation="h", yanchor="bottom", y=-0.3,
+                    xanchor="center", x=0.5),
+    )
+    return go.Figure(data=traces, layout=layout)
+
+
+def status_box(stats, column, title, y_title):
+    """Return box plots per churn status from precomputed ``sketch.box_summary`` statistics."""
+    traces = []
+    for label, summary in stats.items():
+        color = STATUS_COLORS[label]
+        traces.append(go.Box(
+            x=[label], name=label, legendgroup=label, boxmean=True, boxpoints=False,
+            q1=[summary["q1"]], median=[summary["median"]], q3=[summary["q3"]],
+            lowerfence=[summary["lowerfence"]], upperfence=[summary["upperfence"]], mean=[summary["mean"]],
+            marker=dict(color=color, line=dict(color=COLORS['light'], width=1)),
+        ))
+        if len(summary["outliers"]):
+            traces.append(go.Scatter(
+                x=[label] * len(summary["outliers"]), y=summary["outliers"], mode="markers",
+                name=label, legendgroup=label, showlegend=False,
+                marker=dict(color=color, line=dict(color=COLORS['light'], width=1)),
+                hovertemplate=f"ChurnStatus={label}<br>{column}=%{{y:.2f}}<extra>outlier</extra>",
+            ))
+    layout = dict(
+        template=TEMPLATE,
+        title=dict(text=title),
+        xaxis=dict(title=dict(text="ChurnStatus"), categoryorder="array", categoryarray=list(stats)),
+        yaxis=dict(title=dict(text=y_title)),
+        legend=dict(title=dict(text="ChurnStatus")),
+        boxmode="overlay",
+        showlegend=True,
+    )
+    return go.Figure(data=traces, layout=layout)
+
+
+def _scatter_layout():
+    return dict(
+        template=TEMPLATE,
+        title=dict(text="Customer Tenure vs Monthly Charges"),
+        xaxis=dict(title=dict(text="Tenure (Months)")),
+        yaxis=dict(title=dict(text="Monthly Charges ($)")),
+    )
+
+
+def _scatter_points(df):
+    status = df["ChurnStatus"].to_numpy()
+    tenure = df["Tenure"].to_numpy()
+    # Charges are stored as float32; rounding back to cents keeps the JSON short
+    charges = np.round(df["MonthlyCharges"].to_numpy(dtype=np.float64), 2)
+    traces = []
+    for label, color in STATUS_COLORS.items():
+        rows = status == label
+        if not rows.any():
+            continue
+        traces.append(go.Scattergl(
+            x=tenure[rows], y=charges[rows], mode="markers", name=label, legendgroup=label,
+            marker=dict(color=color, opacity=0.7, line=dict(color=COLORS['light'], width=1)),
+            hovertemplate=f"ChurnStatus={label}<br>Tenure=%{{x}}<br>MonthlyCharges=%{{y}}<extra></extra>",
+        ))
+    return go.Figure(data=traces, layout=_scatter_layout())
+
+
+def _scatter_density(df):
+    x_width, y_width = DENSITY_BIN_WIDTHS
+    x_starts, y_starts, totals, churned = bin2d(
+        df["Tenure"].to_numpy(), df["MonthlyCharges"].to_numpy(), churn_flag(df["Churn"]), x_width, y_width
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rates = np.where(totals > 0, np.round(churned / totals * 100, 1), np.nan)
+    heatmap = go.Heatmap(
+        x=x_starts + x_width / 2, y=y_starts + y_width / 2, z=rates,
+        customdata=np.dstack([totals, churned]),
+        colorscale=CHURN_RATE_SCALE, zmin=0, zmax=100,
+        colorbar=dict(title=dict(text="Churn Rate (%)")),
+        hovertemplate=(
+            "Tenure=%{x}<br>MonthlyCharges=%{y}<br>Customers=%{customdata[0]}"
+            "<br>Churned=%{customdata[1]}<br>Churn Rate=%{z}%<extra></extra>"
+        ),
+    )
+    layout = _scatter_layout()
+    layout["title"]["text"] += f" (churn rate per cell, {int(totals.sum()):,} customers)"
+    return go.Figure(data=[heatmap], layout=layout)
+
+
+# The columns ``tenure_charges_scatter`` reads
+SCATTER_COLUMNS = ["Tenure", "MonthlyCharges", "Churn", "ChurnStatus"]
+
+
+def tenure_charges_scatter(df, max_points=SCATTER_MAX_POINTS):
+    """Return the Tenure vs Monthly Charges chart of ``df``.
+
+    Up to ``max_points`` customers are drawn as WebGL points coloured by churn
+    status; beyond that the customers are binned on the server into a grid
+    coloured by churn rate, whose size depends only on the value ranges.
+    """
+    if len(df) <= max_points:
+        return _scatter_points(df)
+    return _scatter_density(df)
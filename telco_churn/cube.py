@@ -0,0 +1,409 @@
+"""Pre-aggregated churn cube answering the dashboard's KPI row and bar charts.
+
+Every bar chart counts or sums churn by one dimension, restricted by the five
+sidebar filters. ``ChurnCube`` keeps a sparse cuboid (one row per observed
+combination) over the filter dimensions, plus one cuboid per chart dimension
+that is not itself a filter dimension. Each cell holds the customer count,
+the churned count and the totals of ``SUM_COLS`` for all and for churned
+customers. A query masks the cuboid's cells with the same ``FilterEngine`` as
+the sidebar and sums them with ``churn_breakdowns``, so its cost follows the
+cube size, not the number of customers. Histograms of the numeric filter
+dimensions (the Age chart) are binned from the same cells, and the base
+cuboid's cells also carry a quantile sketch of each ``SKETCH_COLS`` column
+for all and for churned customers, from which the box plots are drawn, and
+the column's smallest and largest value per churn status, which keep the
+boxes and whiskers within the data.
+
+Cubes are additive: they can be built chunk by chunk, merged, and have rows
+taken back out, which is how the incremental store keeps its cube current.
+"""
+
+import os
+import pickle
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from telco_churn.aggregation import churn_breakdowns, churn_flag, group_codes, status_histogram
+from telco_churn.data import DATA_PATH, SNAPSHOT_DIR, load_dataset, remove_stale, snapshot_path
+from telco_churn.filters import FILTERS, FilterEngine, state_key
+from telco_churn.sketch import MIN_VALUE, box_summary, bucket_index
+from telco_churn.streaming import CHURN_DIMENSIONS, SUM_COLS
+
+FILTER_DIMENSIONS = [f.column for f in FILTERS]
+
+# Rows folded per groupby when building from a loaded frame
+BUILD_CHUNK_ROWS = 1_000_000
+
+
+# Columns with a quantile sketch per base cell, for the box plots
+SKETCH_COLS = ["MonthlyCharges"]
+
+# Bumped whenever the cells change shape; cached cubes of other versions are rebuilt
+CUBE_VERSION = 2
+
+# Per churn status, the prefix of the per-cell extreme columns ``{status}_min:{col}``
+# and ``{status}_max:{col}``
+EXTREME_STATUSES = {"Churned": "churned", "Retained": "retained"}
+
+MEASURE_COLUMNS = ["count", "churned"] + [
+    name for col in SUM_COLS for name in (f"sum:{col}", f"churned_sum:{col}")
+]
+
+
+def _measures(chunk):
+    """Return the per-row measures a cube cell sums up."""
+    flag = churn_flag(chunk["Churn"])
+    churn = flag.astype(bool)
+    measures = {"count": np.ones(len(chunk), dtype=np.int64), "churned": flag.astype(np.int64)}
+    for col in SUM_COLS:
+        values = chunk[col].to_numpy(dtype=np.float64)
+        measures[f"sum:{col}"] = values
+        measures[f"churned_sum:{col}"] = np.where(churn, values, 0.0)
+    return pd.DataFrame(measures, index=chunk.index)
+
+
+def _sketch_cells(chunk, measures, keys, sketch_cols):
+    """Return per-cell sketch counts as ``sketch:{col}:{bucket}`` and ``churned_sketch:...`` columns."""
+    parts = []
+    for col in sketch_cols:
+        values = chunk[col].to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        bucket = pd.Series(bucket_index(np.where(present, values, MIN_VALUE)), index=chunk.index, name="bucket")
+        cells = measures[["count", "churned"]][present].groupby(
+            [key[present] for key in keys] + [bucket[present]], observed=True
+        ).sum().unstack("bucket", fill_value=0)
+        cells.columns = [
+            f"{'sketch' if measure == 'count' else 'churned_sketch'}:{col}:{b}" for measure, b in cells.columns
+        ]
+        parts.append(cells)
+    return pd.concat(parts, axis=1)
+
+
+def _extreme_cells(chunk, keys, sketch_cols):
+    """Return per-cell ``{status}_min:{col}`` and ``{status}_max:{col}`` columns, NaN where a status has no value."""
+    status = pd.Series(
+        np.where(churn_flag(chunk["Churn"]).astype(bool), "churned", "retained"), index=chunk.index, name="status"
+    )
+    parts = []
+    for col in sketch_cols:
+        values = chunk[col].astype(np.float64)
+        present = values.notna().to_numpy()
+        grouped = values[present].groupby([key[present] for key in keys] + [status[present]], observed=True)
+        for stat in ("min", "max"):
+            cells = grouped.agg(stat).unstack("status").reindex(columns=list(EXTREME_STATUSES.values()))
+            cells.columns = [f"{prefix}_{stat}:{col}" for prefix in cells.columns]
+            parts.append(cells)
+    return pd.concat(parts, axis=1)
+
+
+def _is_extreme(name):
+    return "_min:" in name or "_max:" in name
+
+
+def is_current(cube):
+    """Return whether a cached cube has the cells this version of ``ChurnCube`` expects."""
+    return getattr(cube, "version", 1) == CUBE_VERSION and getattr(cube, "sketch_cols", None) == SKETCH_COLS
+
+
+class ChurnCube:
+    """Sparse cuboids of churn measures over the filter and chart dimensions."""
+
+    def __init__(self, filter_dims=FILTER_DIMENSIONS, chart_dims=CHURN_DIMENSIONS, sketch_cols=SKETCH_COLS):
+        self.filter_dims = list(filter_dims)
+        self.chart_dims = list(chart_dims)
+        self.sketch_cols = list(sketch_cols)
+        self.version = CUBE_VERSION
+        # The base cuboid (key None) also answers charts over a filter dimension
+        self.cuboids = dict.fromkeys([None] + [d for d in self.chart_dims if d not in self.filter_dims])
+        self._frames = {}
+        self._masks = {}
+        self._codes = {}
+        self._sketches = {}
+
+    @classmethod
+    def from_frame(cls, df, chunk_rows=BUILD_CHUNK_ROWS, **kwargs):
+        cube = cls(**kwargs)
+        for start in range(0, len(df), chunk_rows):
+            cube.update(df.iloc[start:start + chunk_rows])
+        return cube
+
+    @classmethod
+    def from_chunks(cls, chunks, **kwargs):
+        cube = cls(**kwargs)
+        for chunk in chunks:
+            cube.update(chunk)
+        return cube
+
+    def dimensions(self, key):
+        return self.filter_dims + ([key] if key is not None else [])
+
+    def update(self, chunk):
+        """Add a prepared chunk's rows to the cube."""
+        return self._fold(chunk, 1)
+
+    def remove(self, chunk):
+        """Take rows previously added back out of the cube.
+
+        Cell minimums and maximums can't be taken back out and stay as bounds;
+        ``box_stats`` tightens them to the sketch buckets still holding values.
+        """
+        return self._fold(chunk, -1)
+
+    def _fold(self, chunk, sign):
+        if chunk.empty:
+            return self
+        measures = _measures(chunk)
+        for key in self.cuboids:
+            keys = [chunk[dim] for dim in self.dimensions(key)]
+            cells = measures.groupby(keys, observed=True).sum()
+            if key is None and self.sketch_cols:
+                cells = cells.join(_sketch_cells(chunk, measures, keys, self.sketch_cols)).fillna(0)
+            cells = sign * cells
+            if key is None and self.sketch_cols and sign > 0:
+                cells = cells.join(_extreme_cells(chunk, keys, self.sketch_cols))
+            self._combine(key, cells)
+        return self
+
+    def _combine(self, key, cells):
+        current = self.cuboids[key]
+        if current is not None:
+            extremes = [col for col in current.columns.union(cells.columns, sort=False) if _is_extreme(col)]
+            # Aligning widens the counts to floats; they stay exact well past any table size
+            combined = current.drop(columns=extremes, errors="ignore").add(
+                cells.drop(columns=extremes, errors="ignore"), fill_value=0
+            )
+            combined = combined[combined["count"] != 0].astype({"count": np.int64, "churned": np.int64})
+            bounds = {}
+            for col in extremes:
+                sides = [side[col].reindex(combined.index).to_numpy() for side in (current, cells)
+                         if col in side.columns]
+                pick = np.fmin if "_min:" in col else np.fmax
+                bounds[col] = pick.reduce(sides) if len(sides) > 1 else sides[0]
+            cells = pd.concat([combined, pd.DataFrame(bounds, index=combined.index)], axis=1)
+        if key is None:
+            # Buckets first seen in either side are missing from the other's cells
+            sketch = [col for col in cells.columns if "sketch:" in col]
+            cells = cells.fillna(dict.fromkeys(sketch, 0)).astype(dict.fromkeys(sketch, np.int32))
+            self._sketches.clear()
+        self.cuboids[key] = cells
+        self._frames.pop(key, None)
+        self._masks.pop(key, None)
+        self._codes = {k: v for k, v in self._codes.items() if k[0] != key}
+
+    def merge(self, other):
+        """Combine with a cube built from a disjoint set of rows."""
+        for key, cells in other.cuboids.items():
+            if cells is not None:
+                self._combine(key, cells)
+        return self
+
+    def __getstate__(self):
+        # Query caches are rebuilt on demand rather than pickled
+        return {k: v for k, v in self.__dict__.items() if k not in ("_frames", "_masks", "_codes", "_sketches")}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._frames, self._masks, self._codes, self._sketches = {}, {}, {}, {}
+
+    def _frame(self, key):
+        """Return the cuboid with its dimensions as plain columns for filtering."""
+        if key not in self._frames:
+            cells = self.cuboids[key]
+            if cells is None:
+                cells = pd.DataFrame(columns=self.dimensions(key) + MEASURE_COLUMNS)
+            else:
+                cells = cells.reset_index()
+            self._frames[key] = cells
+        return self._frames[key]
+
+    def _mask(self, key, state):
+        """Return the cells of a cuboid passing ``state``, or ``None`` for all of them.
+
+        The KPI row and most charts read the base cuboid under the same state
+        within a rerun, so the last mask of each cuboid is kept.
+        """
+        if not state:
+            return None
+        token = state_key(state)
+        cached = self._masks.get(key)
+        if cached is None or cached[0] != token:
+            cached = self._masks[key] = (token, FilterEngine(self._frame(key)).mask(state))
+        return cached[1]
+
+    def _column(self, key, column, mask):
+        values = self._frame(key)[column].to_numpy()
+        return values if mask is None else values[mask]
+
+    def cells(self, key=None, state=None):
+        """Return the cells of a cuboid that pass the filter ``state``."""
+        frame = self._frame(key)
+        mask = self._mask(key, state)
+        return frame if mask is None else frame[mask]
+
+    def kpis(self, state=None):
+        """Return the KPI values for the filtered customers, keyed like ``ChurnAggregates.kpis``."""
+        mask = self._mask(None, state)
+        totals = {col: self._column(None, col, mask).sum() for col in MEASURE_COLUMNS}
+        rows = int(totals["count"])
+        churned = int(totals["churned"])
+        churn_rate = (churned / rows * 100) if rows > 0 else 0
+
+        def mean(col):
+            return totals[f"sum:{col}"] / rows if rows else 0
+
+        return {
+            "total_customers": rows,
+            "churned_customers": churned,
+            "retained_customers": rows - churned,
+            "churn_rate": churn_rate,
+            "retention_rate": 100 - churn_rate,
+            "monthly_revenue_loss": float(totals["churned_sum:MonthlyCharges"]),
+            "avg_monthly_charges": mean("MonthlyCharges"),
+            "total_revenue": float(totals["sum:TotalCharges"]),
+            "avg_tenure": mean("Tenure"),
+            "avg_age": mean("Age"),
+            "satisfaction_score": mean("Satisfaction Score"),
+        }
+
+    def breakdowns(self, dims, state=None):
+        """Return ``{dim: [dim, Churn, Total, Churn_Rate]}`` for the filtered customers."""
+        by_cuboid = {}
+        for dim in dims:
+            by_cuboid.setdefault(dim if dim in self.cuboids else None, []).append(dim)
+
+        tables = {}
+        for key, key_dims in by_cuboid.items():
+            frame = self._frame(key)
+            for dim in key_dims:
+                if (key, dim) not in self._codes:
+                    self._codes[key, dim] = group_codes(frame[dim])
+            tables.update(churn_breakdowns(
+                frame, key_dims,
+                flag=frame["churned"].to_numpy(),
+                count=frame["count"].to_numpy(),
+                mask=self._mask(key, state),
+                codes={dim: self._codes[key, dim] for dim in key_dims},
+            ))
+        return {dim: tables[dim] for dim in dims}
+
+    def breakdown(self, dim, state=None):
+        """Return ``[dim, Churn, Total, Churn_Rate]`` for the filtered customers."""
+        return self.breakdowns([dim], state)[dim]
+
+    def histogram(self, dim, state=None, nbins=20):
+        """Return ``status_histogram`` of a filter dimension for the filtered customers."""
+        mask = self._mask(None, state)
+        return status_histogram(
+            self._column(None, dim, mask).astype(np.float64),
+            self._column(None, "churned", mask),
+            self._column(None, "count", mask),
+            nbins,
+        )
+
+    def _sketch(self, col):
+        """Return the sorted buckets and the per-cell all/churned count matrices of a sketch column."""
+        if col not in self._sketches:
+            frame = self._frame(None)
+            prefix = f"sketch:{col}:"
+            names = [name for name in frame.columns if name.startswith(prefix)]
+            buckets = np.array([int(name[len(prefix):]) for name in names], dtype=np.int64)
+            order = np.argsort(buckets)
+            names = [names[i] for i in order]
+            self._sketches[col] = (
+                buckets[order],
+                frame[names].to_numpy(),
+                frame[[f"churned_{name}" for name in names]].to_numpy(),
+            )
+        return self._sketches[col]
+
+    def box_stats(self, col, state=None):
+        """Return ``{ChurnStatus: box_summary}`` of a sketched column for the filtered customers.
+
+        Statuses without customers are left out.
+        """
+        buckets, everyone, churned = self._sketch(col)
+        mask = self._mask(None, state)
+        if mask is not None:
+            everyone, churned = everyone[mask], churned[mask]
+        everyone, churned = everyone.sum(axis=0), churned.sum(axis=0)
+
+        ranges = {}
+        frame = self._frame(None)
+        for status, prefix in EXTREME_STATUSES.items():
+            # No cells pass a filter state that matches no customer, and there is nothing to reduce
+            if f"{prefix}_min:{col}" in frame.columns and (mask is None or mask.any()):
+                with np.errstate(invalid="ignore"), warnings.catch_warnings():
+                    # All-NaN when no filtered customer has this status; the summary is None then
+                    warnings.simplefilter("ignore", RuntimeWarning)
+                    ranges[status] = (np.nanmin(self._column(None, f"{prefix}_min:{col}", mask)),
+                                      np.nanmax(self._column(None, f"{prefix}_max:{col}", mask)))
+
+        means = {}
+        if f"sum:{col}" in MEASURE_COLUMNS:
+            # The cube's exact sums give exact means, unlike the bucket estimate
+            count, n_churned, total, churned_total = (
+                self._column(None, name, mask).sum()
+                for name in ("count", "churned", f"sum:{col}", f"churned_sum:{col}")
+            )
+            if n_churned:
+                means["Churned"] = churned_total / n_churned
+            if count - n_churned:
+                means["Retained"] = (total - churned_total) / (count - n_churned)
+
+        stats = {
+            "Churned": box_summary(buckets, churned, means.get("Churned"), ranges.get("Churned")),
+            "Retained": box_summary(buckets, everyone - churned, means.get("Retained"), ranges.get("Retained")),
+        }
+        return {status: summary for status, summary in stats.items() if summary is not None}
+
+    def revenue_by_status(self, state=None):
+        """Return total charges of churned and retained customers as ``[ChurnStatus, TotalCharges]``."""
+        mask = self._mask(None, state)
+        customers, churned, revenue, churned_revenue = (
+            self._column(None, col, mask).sum()
+            for col in ("count", "churned", "sum:TotalCharges", "churned_sum:TotalCharges")
+        )
+        table = pd.DataFrame({
+            "ChurnStatus": ["Churned", "Retained"],
+            "TotalCharges": [churned_revenue, revenue - churned_revenue],
+            "Customers": [churned, customers - churned],
+        })
+        return table[table["Customers"] > 0].drop(columns="Customers").reset_index(drop=True)
+
+
+def cube_path(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.splitext(snapshot_path(path, snapshot_dir))[0] + ".cube.pkl"
+
+
+def load_cube(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR, df=None):
+    """Load the cube for ``path``, building and caching it next to the snapshot if needed.
+
+    ``df`` may pass an already loaded frame to build from.
+    """
+    if os.path.isdir(path):
+        from telco_churn.incremental import load_store_cube
+        return load_store_cube(path)
+
+    cached = cube_path(path, snapshot_dir)
+    if os.path.exists(cached):
+        try:
+            with open(cached, "rb") as f:
+                cube = pickle.load(f)
+            # Cubes cached by an earlier version are rebuilt
+            if is_current(cube):
+                return cube
+        except Exception:
+            pass
+
+    cube = ChurnCube.from_frame(df if df is not None else load_dataset(path, snapshot_dir))
+    try:
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(cube, f)
+        os.replace(tmp, cached)
+        remove_stale(cached)
+    except OSError:
+        pass
+    return cube
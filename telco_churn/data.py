@@ -0,0 +1,254 @@
+"""Loading the ml-ready churn dataset.
+
+Parsing the CSV and coercing its columns is the slowest part of a cold start,
+so the prepared frame is written to a Parquet snapshot the first time and read
+back from there afterwards. Snapshots are keyed on the source file's size and
+modification time, so editing or replacing the CSV rebuilds them automatically.
+
+Every column has an explicit compact dtype (see ``SCHEMA``): categoricals for
+the low-cardinality strings, real booleans for the service flags and the
+narrowest integer/float32 type that fits each numeric range. Every cached copy
+the dashboard keeps pays for these per-row bytes, so keep them tight.
+"""
+
+import glob
+import hashlib
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Either the ml-ready CSV or an incremental store directory (see telco_churn.incremental)
+DATA_PATH = os.environ.get("TELCO_DATA_PATH", "./dataset/ml_ready_telco.csv")
+# Snapshots, column exports and cubes; also the default home of the exports and score cache
+SNAPSHOT_DIR = os.environ.get("TELCO_SNAPSHOT_DIR", "./dataset/.cache")
+
+# Bump whenever prepare_frame changes so that stale snapshots are rebuilt
+SNAPSHOT_VERSION = 3
+
+COLUMN_RENAMES = {
+    "Tenure in Months": "Tenure",
+    "Churn Label": "Churn",
+    "Monthly Charge": "MonthlyCharges",
+    "Total Charges": "TotalCharges"
+}
+
+BOOL_COLS = ["Senior Citizen", "Married", "Dependents", "Phone Service", "Multiple Lines",
+             "Internet Service", "Online Security", "Online Backup", "Device Protection Plan",
+             "Premium Tech Support", "Streaming TV", "Streaming Movies", "Streaming Music",
+             "Unlimited Data", "Paperless Billing"]
+
+NUMERIC_COLS = ["MonthlyCharges", "TotalCharges", "Tenure", "Age"]
+
+TRUE_VALUES = [True, "True", "Yes"]
+
+# dtypes of the source columns, keyed by their names in ml_ready_telco.csv
+SCHEMA = {
+    "Gender": "category",
+    "Age": "int8",
+    "Under 30": "bool",
+    "Senior Citizen": "bool",
+    "Married": "bool",
+    "Dependents": "bool",
+    "Number of Dependents": "int8",
+    "Population": "int32",
+    "Referred a Friend": "bool",
+    "Number of Referrals": "int8",
+    "Tenure in Months": "int8",
+    "Offer": "category",
+    "Phone Service": "bool",
+    "Avg Monthly Long Distance Charges": "float32",
+    "Multiple Lines": "bool",
+    "Internet Service": "bool",
+    "Internet Type": "category",
+    "Avg Monthly GB Download": "int16",
+    "Online Security": "bool",
+    "Online Backup": "bool",
+    "Device Protection Plan": "bool",
+    "Premium Tech Support": "bool",
+    "Streaming TV": "bool",
+    "Streaming Movies": "bool",
+    "Streaming Music": "bool",
+    "Unlimited Data": "bool",
+    "Contract": "category",
+    "Paperless Billing": "bool",
+    "Payment Method": "category",
+    "Monthly Charge": "float32",
+    "Total Charges": "float32",
+    "Total Refunds": "float32",
+    "Total Extra Data Charges": "int16",
+    "Total Long Distance Charges": "float32",
+    "Total Revenue": "float32",
+    "Satisfaction Score": "int8",
+    "Customer Status": "category",
+    "Churn Label": "category",
+    "Churn Score": "int8",
+    "CLTV": "int16",
+    "Total Addon Services": "int8",
+    "Tenure in Years": "int8",
+}
+
+# Columns stored as text in the CSV ("Yes"/"No") must be parsed before they become booleans
+_TEXT_BOOL_COLS = ["Internet Service"]
+
+CITIZENSHIP_CATEGORIES = ["Senior Citizen", "Young Citizen"]
+CHURN_STATUS_CATEGORIES = ["Churned", "Retained"]
+
+
+def read_dtypes(columns=None):
+    """Return the ``pd.read_csv`` dtype mapping for the source columns.
+
+    Integer columns are left out: ``pd.read_csv`` wraps values that don't fit
+    a narrow type (200 reads as -56 for int8), so they are parsed at full
+    width and narrowed by ``apply_schema`` once their range is known.
+    """
+    dtypes = {
+        col: ("category" if col in _TEXT_BOOL_COLS else dtype)
+        for col, dtype in SCHEMA.items()
+        if not pd.api.types.is_integer_dtype(dtype)
+    }
+    if columns is not None:
+        dtypes = {col: dtype for col, dtype in dtypes.items() if col in columns}
+    return dtypes
+
+
+def integer_dtype(series, dtype):
+    """Return the type to store the numeric ``series`` of an integer ``SCHEMA`` column in.
+
+    That is ``dtype`` when every value fits, the narrowest wider integer type
+    that holds them all otherwise, and a float type when values are missing
+    or fractional. ``astype`` would silently wrap or truncate them instead.
+    """
+    values = series.to_numpy()
+    if not len(values):
+        return dtype
+    if series.isna().any() or (values.dtype.kind == "f" and (values != np.floor(values)).any()):
+        # float32 holds integers exactly up to 2**24
+        return "float32" if np.nanmax(np.abs(values), initial=0) <= 2**24 else "float64"
+    low, high = values.min(), values.max()
+    for candidate in (dtype, "int16", "int32", "int64"):
+        info = np.iinfo(candidate)
+        if np.dtype(candidate).itemsize >= np.dtype(dtype).itemsize and info.min <= low and high <= info.max:
+            return candidate
+    raise ValueError(f"{series.name} has values outside the int64 range")
+
+
+def apply_schema(df):
+    """Cast source columns to ``SCHEMA``, tolerating dirty numeric values.
+
+    Columns that already have the right dtype are left alone, so this is cheap
+    on frames read with ``read_dtypes``; integer columns are only narrowed as
+    far as their values allow (see ``integer_dtype``).
+    """
+    for col, dtype in SCHEMA.items():
+        target = COLUMN_RENAMES.get(col, col)
+        if target not in df.columns or df[target].dtype == dtype:
+            continue
+        series = df[target]
+        if dtype == "bool":
+            df[target] = series.isin(TRUE_VALUES)
+        elif dtype == "category":
+            df[target] = series.astype("category")
+        else:
+            series = pd.to_numeric(series, errors='coerce')
+            if not dtype.startswith("float"):
+                dtype = integer_dtype(series, dtype)
+            df[target] = series.astype(dtype)
+    return df
+
+
+def prepare_frame(df):
+    """Apply the dashboard's renames, schema and derived columns to a raw frame."""
+    df = apply_schema(df.rename(columns=COLUMN_RENAMES))
+    df["CitizenshipStatus"] = pd.Categorical.from_codes(
+        (~df["Senior Citizen"]).to_numpy(dtype=np.int8), CITIZENSHIP_CATEGORIES
+    )
+    df["ChurnStatus"] = pd.Categorical.from_codes(
+        (df["Churn"] != "Yes").to_numpy(dtype=np.int8), CHURN_STATUS_CATEGORIES
+    )
+    return df
+
+
+def read_csv(path=DATA_PATH, **kwargs):
+    """``pd.read_csv`` with the compact schema, falling back to inference on dirty files."""
+    try:
+        return pd.read_csv(path, dtype=read_dtypes(), **kwargs)
+    except (ValueError, TypeError):
+        # e.g. blanks in an integer column; apply_schema coerces those afterwards
+        return pd.read_csv(path, **kwargs)
+
+
+def read_source(path=DATA_PATH):
+    """Parse and prepare the source without touching the snapshot cache."""
+    if os.path.isdir(path):
+        from telco_churn.incremental import read_store
+        return read_store(path)
+    return prepare_frame(read_csv(path))
+
+
+def source_key(path=DATA_PATH):
+    """Return a short key identifying the current contents of ``path``."""
+    if os.path.isdir(path):
+        # An incremental store changes exactly when its manifest is rewritten
+        from telco_churn.incremental import MANIFEST_FILE
+        stat = os.stat(os.path.join(path, MANIFEST_FILE))
+    else:
+        stat = os.stat(path)
+    raw = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{SNAPSHOT_VERSION}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def snapshot_path(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR):
+    stem = os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+    return os.path.join(snapshot_dir, f"{stem}-{source_key(path)}.parquet")
+
+
+def remove_stale(current):
+    """Remove cache entries of the same source and kind as ``current`` but another key.
+
+    Cache entries are named ``<stem>-<key><suffix>``, e.g. the snapshot
+    ``ml_ready_telco-<key>.parquet`` or its ``.columns`` directory.
+    """
+    directory, name = os.path.split(current)
+    stem, tail = name.rsplit("-", 1)
+    suffix = tail[len(tail.split(".", 1)[0]):]
+    for stale in glob.glob(os.path.join(directory, f"{glob.escape(stem)}-*{suffix}")):
+        if stale == current:
+            continue
+        if os.path.isdir(stale):
+            # Processes still mapping the old files keep them alive until they exit
+            shutil.rmtree(stale, ignore_errors=True)
+        else:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def write_snapshot(df, snapshot):
+    """Atomically write ``df`` to ``snapshot`` and drop older snapshots of the same source."""
+    os.makedirs(os.path.dirname(snapshot), exist_ok=True)
+    tmp = f"{snapshot}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, snapshot)
+    remove_stale(snapshot)
+
+
+def load_dataset(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR):
+    """Load the prepared dataset, building or refreshing its snapshot if needed."""
+    snapshot = snapshot_path(path, snapshot_dir)
+    if os.path.exists(snapshot):
+        try:
+            return pd.read_parquet(snapshot)
+        except Exception:
+            # A truncated or unreadable snapshot is rebuilt from the CSV below
+            pass
+
+    df = read_source(path)
+    try:
+        write_snapshot(df, snapshot)
+    except (OSError, ValueError):
+        # Read-only deployments still work, they just re-parse on every cold start
+        pass
+    return df
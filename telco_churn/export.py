@@ -0,0 +1,113 @@
+"""Chunked export of the filtered customers as gzip CSV or Parquet.
+
+Serializing the whole selection with ``to_csv`` builds the entire file as one
+string in memory. ``write_export`` instead walks the selected rows
+``EXPORT_CHUNK_ROWS`` at a time and appends each chunk to the output file, so
+memory stays bounded by one chunk whatever the size of the selection. Exports
+are written next to the snapshots, keyed on the dataset and filter state, so
+asking twice for the same selection reuses the file; only the most recent
+``MAX_EXPORTS`` are kept on disk.
+"""
+
+import glob
+import gzip
+import hashlib
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from telco_churn.data import SNAPSHOT_DIR
+
+EXPORT_DIR = os.environ.get("TELCO_EXPORT_DIR", os.path.join(SNAPSHOT_DIR, "exports"))
+
+EXPORT_CHUNK_ROWS = int(os.environ.get("TELCO_EXPORT_CHUNK_ROWS", 100_000))
+
+# Finished exports kept on disk for reuse; older ones are removed
+MAX_EXPORTS = 8
+
+# format: (file suffix, MIME type)
+EXPORT_FORMATS = {
+    "CSV (gzip)": (".csv.gz", "application/gzip"),
+    "Parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+
+def iter_rows(df, rows=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield ``df`` (or its ``rows`` positions) as consecutive frames of at most ``chunk_rows`` rows."""
+    n_rows = len(df) if rows is None else len(rows)
+    for start in range(0, n_rows, chunk_rows):
+        if rows is None:
+            yield df.iloc[start:start + chunk_rows]
+        else:
+            yield df.take(rows[start:start + chunk_rows])
+
+
+def write_csv_gz(chunks, path, empty):
+    with gzip.open(path, "wb", compresslevel=6) as f:
+        header = True
+        for chunk in chunks:
+            f.write(chunk.to_csv(index=False, header=header).encode("utf-8"))
+            header = False
+        if header:
+            # No rows selected: still write the header line
+            f.write(empty.to_csv(index=False).encode("utf-8"))
+
+
+def write_parquet(chunks, path, empty):
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            # No rows selected: still write a file with the columns
+            pq.write_table(pa.Table.from_pandas(empty, preserve_index=False), path)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_path(key, fmt, export_dir=EXPORT_DIR):
+    """Return the file an export of selection ``key`` in format ``fmt`` is written to."""
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+    return os.path.join(export_dir, f"telco_export-{digest}{EXPORT_FORMATS[fmt][0]}")
+
+
+def write_export(df, rows, fmt, key, export_dir=EXPORT_DIR, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Write the ``rows`` of ``df`` (all when ``None``) as ``fmt`` and return the file path.
+
+    An existing export of the same ``key`` is returned as is.
+    """
+    path = export_path(key, fmt, export_dir)
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+
+    os.makedirs(export_dir, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    chunks = iter_rows(df, rows, chunk_rows)
+    try:
+        if fmt == "Parquet":
+            write_parquet(chunks, tmp, df.iloc[:0])
+        else:
+            write_csv_gz(chunks, tmp, df.iloc[:0])
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    remove_old_exports(export_dir)
+    return path
+
+
+def remove_old_exports(export_dir=EXPORT_DIR, keep=MAX_EXPORTS):
+    exports = [p for p in glob.glob(os.path.join(export_dir, "telco_export-*")) if not p.endswith(".tmp")]
+    for stale in sorted(exports, key=os.path.getmtime)[:-keep]:
+        try:
+            os.remove(stale)
+        except OSError:
+            # Another session got there first
+            pass
@@ -0,0 +1,186 @@
+"""Sidebar filter engine.
+
+Each sidebar filter is described by a ``CategoryFilter`` or ``RangeFilter`` in
+``FILTERS``. ``FilterEngine`` turns the sidebar state into one boolean mask in
+a single pass over the data: rows are processed in cache-sized blocks, and
+every predicate is ANDed into the block's slice of the mask before moving on,
+so no intermediate frames are allocated. Adding a filter only means adding a
+spec to ``FILTERS``.
+
+With ``indexed=True`` the engine instead builds a bitmap or sorted-range index
+per filter column up front (see ``telco_churn.indexes``) and resolves a state
+with a few bitwise ANDs and binary searches. Given an ``index_dir`` (the
+column export of a memory-mapped dataset), the sorted-range indexes are saved
+there and mapped back rather than rebuilt by every process.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from telco_churn.indexes import BitmapIndex, SortedRangeIndex, bitmap_to_mask
+
+# Rows per block; small enough that every predicate's temporaries stay in cache
+BLOCK_ROWS = 65_536
+
+
+class CategoryFilter:
+    """Keep rows whose value is one of the selected options."""
+
+    kind = "category"
+
+    def __init__(self, column, label, help):
+        self.column = column
+        self.label = label
+        self.help = help
+
+    def options(self, df):
+        return df[self.column].unique().tolist()
+
+    def build_index(self, series, directory=None):
+        # A bit per row and value over a few values; kept in memory
+        return BitmapIndex(series)
+
+    def lookup(self, index, value):
+        return index.lookup(value)
+
+    def is_active(self, value):
+        # An empty multiselect means "don't filter", as it always has in the sidebar
+        return bool(value)
+
+    def normalize(self, value):
+        return tuple(sorted(value, key=str)) if self.is_active(value) else None
+
+    def compile(self, series, value):
+        """Return ``fn(start, stop, out)`` that ANDs the predicate into ``out``."""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Look the category codes up in a table; the extra False slot catches code -1 (missing)
+            allowed = np.append(series.cat.categories.isin(value), False)
+            codes = series.cat.codes.to_numpy()
+            return lambda start, stop, out: np.logical_and(out, allowed[codes[start:stop]], out=out)
+        values = series.to_numpy()
+        if values.dtype == bool:
+            allowed = np.array([False in value, True in value])
+            return lambda start, stop, out: np.logical_and(out, allowed[values[start:stop].view(np.uint8)], out=out)
+        return lambda start, stop, out: np.logical_and(out, np.isin(values[start:stop], value), out=out)
+
+
+class RangeFilter:
+    """Keep rows whose value lies within an inclusive ``(low, high)`` range."""
+
+    kind = "range"
+
+    def __init__(self, column, label, help):
+        self.column = column
+        self.label = label
+        self.help = help
+
+    def bounds(self, df):
+        return int(df[self.column].min()), int(df[self.column].max())
+
+    def build_index(self, series, directory=None):
+        if directory is None:
+            return SortedRangeIndex(series)
+        return SortedRangeIndex.open(series, directory)
+
+    def lookup(self, index, value):
+        return index.lookup(*value)
+
+    def is_active(self, value):
+        return value is not None
+
+    def normalize(self, value):
+        return (int(value[0]), int(value[1])) if self.is_active(value) else None
+
+    def compile(self, series, value):
+        low, high = value
+        values = series.to_numpy()
+
+        def apply(start, stop, out):
+            block = values[start:stop]
+            np.logical_and(out, block >= low, out=out)
+            np.logical_and(out, block <= high, out=out)
+        return apply
+
+
+FILTERS = [
+    CategoryFilter("Gender", "👥 Gender", "Filter customers by gender"),
+    CategoryFilter("Contract", "📝 Contract Type", "Filter by contract duration"),
+    CategoryFilter("Internet Service", "🌐 Internet Service", "Filter by internet service type"),
+    RangeFilter("Age", "👶 Age Range", "Select customer age range"),
+    RangeFilter("Tenure", "⏰ Tenure Range (Months)", "Filter by customer tenure"),
+]
+
+
+def state_key(state, filters=FILTERS):
+    """Return a hashable key for a filter state, independent of the order of multiselect choices."""
+    return tuple((f.column, f.normalize(state.get(f.column))) for f in filters)
+
+
+class FilterEngine:
+    """Resolve a ``{column: value}`` filter state against a frame."""
+
+    def __init__(self, df, filters=FILTERS, indexed=False, index_dir=None):
+        self.df = df
+        self.filters = [f for f in filters if f.column in df.columns]
+        self.indexes = {}
+        if indexed:
+            self.indexes = {
+                f.column: f.build_index(
+                    df[f.column], None if index_dir is None else os.path.join(index_dir, f"{f.column}.index")
+                )
+                for f in self.filters
+            }
+
+    def options(self, spec):
+        """Return the multiselect options of a category filter."""
+        if spec.column in self.indexes:
+            return list(self.indexes[spec.column].values)
+        return spec.options(self.df)
+
+    def bounds(self, spec):
+        """Return the slider bounds of a range filter."""
+        if spec.column in self.indexes:
+            low, high = self.indexes[spec.column].bounds
+            return int(low), int(high)
+        return spec.bounds(self.df)
+
+    def mask(self, state):
+        """Return a boolean mask of the rows passing every active filter."""
+        if self.indexes:
+            return self._indexed_mask(state)
+        predicates = [
+            f.compile(self.df[f.column], state[f.column])
+            for f in self.filters
+            if f.is_active(state.get(f.column))
+        ]
+        n_rows = len(self.df)
+        mask = np.ones(n_rows, dtype=bool)
+        for start in range(0, n_rows, BLOCK_ROWS):
+            stop = min(start + BLOCK_ROWS, n_rows)
+            out = mask[start:stop]
+            for predicate in predicates:
+                predicate(start, stop, out)
+        return mask
+
+    def _indexed_mask(self, state):
+        bitmap = None
+        for f in self.filters:
+            if not f.is_active(state.get(f.column)):
+                continue
+            # Lookups return fresh bitmaps (or None for "every row"), so ANDing in place is safe
+            rows = f.lookup(self.indexes[f.column], state[f.column])
+            if rows is None:
+                continue
+            bitmap = rows if bitmap is None else np.bitwise_and(bitmap, rows, out=bitmap)
+        if bitmap is None:
+            return np.ones(len(self.df), dtype=bool)
+        return bitmap_to_mask(bitmap, len(self.df))
+
+    def select(self, state):
+        """Return the selected row positions, or ``None`` when every row passes."""
+        mask = self.mask(state)
+        if mask.all():
+            return None
+        return np.flatnonzero(mask)
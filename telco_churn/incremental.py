@@ -0,0 +1,324 @@
+"""Incremental refresh of the customer table as new quarters of data land.
+
+A store directory holds the prepared customer table as append-only Parquet
+parts, an index from Customer ID to the part and row holding each customer's
+current version, and the ``ChurnAggregates`` and ``ChurnCube`` of the live
+rows. A refresh reads the new batch, the index entries of its customers and
+the rows the batch supersedes. Those rows are taken out of the aggregates and
+the cube, the batch is added in and written as a new part, so the cost of a
+refresh follows the size of the batch, not of the table.
+
+The index is split into ``INDEX_SHARDS`` files by a CRC-32 of the Customer
+ID, each a small sorted ``.npy`` array, and a refresh only reads and rewrites
+the shards its customers fall into.
+
+    python -m telco_churn.incremental seed dataset/telco.csv
+    python -m telco_churn.incremental refresh new_quarter.csv
+
+Point the dashboard at the store with ``TELCO_DATA_PATH=./dataset/store``.
+"""
+
+import argparse
+import glob
+import json
+import os
+import pickle
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from telco_churn.cube import ChurnCube, is_current
+from telco_churn.data import apply_schema, prepare_frame
+from telco_churn.streaming import ChurnAggregates
+
+RAW_PATH = "./dataset/telco.csv"
+STORE_DIR = "./dataset/store"
+MANIFEST_FILE = "manifest.json"
+ID_COL = "Customer ID"
+
+# Small row groups let a refresh read back only the superseded rows it needs
+ROW_GROUP_ROWS = 65_536
+
+# Files the Customer ID index is split into; a batch of n customers touches about
+# INDEX_SHARDS * (1 - exp(-n / INDEX_SHARDS)) of them, at about a millisecond each
+INDEX_SHARDS = 256
+INDEX_DIR = "index"
+
+# Cleaning steps of Notebooks/telco_churn_analysis.ipynb that produce ml_ready_telco.csv
+YES_NO_COLS = ["Under 30", "Senior Citizen", "Married", "Dependents", "Referred a Friend",
+               "Phone Service", "Multiple Lines", "Online Security", "Online Backup",
+               "Device Protection Plan", "Premium Tech Support", "Streaming TV",
+               "Streaming Movies", "Streaming Music", "Unlimited Data", "Paperless Billing"]
+ADDON_SERVICES = ["Online Security", "Online Backup", "Device Protection Plan",
+                  "Premium Tech Support", "Streaming TV", "Streaming Movies", "Streaming Music"]
+DROP_COLS = ["Country", "State", "City", "Zip Code", "Latitude", "Longitude",
+             "Churn Reason", "Churn Category"]
+
+
+def to_ml_ready(raw):
+    """Apply the notebook's cleaning to a raw extract, keeping Customer ID and Quarter."""
+    df = raw.drop(columns=[col for col in DROP_COLS if col in raw.columns])
+    for col in YES_NO_COLS:
+        df[col] = df[col].astype(str).str.strip().str.lower() == "yes"
+    df["Total Addon Services"] = df[ADDON_SERVICES].sum(axis=1)
+    df["Tenure in Years"] = pd.cut(
+        df["Tenure in Months"], bins=range(0, 73, 12), labels=range(1, 7)
+    ).astype(float)
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = df[col].fillna("None")
+    return df
+
+
+def _read_manifest(store_dir):
+    try:
+        with open(os.path.join(store_dir, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"generation": 0, "parts": [], "index": None, "aggregates": None, "cube": None, "rows": 0}
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def index_shard(ids, shards=INDEX_SHARDS):
+    """Return the index shard of every Customer ID in ``ids``.
+
+    CRC-32 rather than ``hash``, which is salted per process.
+    """
+    return np.fromiter((zlib.crc32(str(i).encode()) for i in ids), dtype=np.int64, count=len(ids)) % shards
+
+
+def _entry_dtype(*arrays):
+    """Return the index entry dtype with room for the longest ID in any of ``arrays``."""
+    width = max([array.dtype["id"].itemsize // 4 if array.dtype.names else array.dtype.itemsize // 4
+                 for array in arrays] + [1])
+    return np.dtype([("id", f"U{width}"), ("part", np.int32), ("row", np.int64)])
+
+
+def _entries(ids, part, row):
+    """Return index entries as a structured array."""
+    ids = np.asarray(ids, dtype=str)
+    entries = np.empty(len(ids), dtype=_entry_dtype(ids))
+    entries["id"], entries["part"], entries["row"] = ids, part, row
+    return entries
+
+
+def _sorted(entries):
+    # Sorting on the ID field alone; order="id" compares whole records
+    return entries[np.argsort(entries["id"], kind="stable")]
+
+
+def _empty_shard():
+    return _entries([], 0, 0)
+
+
+def _read_shard(store_dir, name):
+    """Return the entries of an index shard, sorted by Customer ID."""
+    return _empty_shard() if name is None else np.load(os.path.join(store_dir, INDEX_DIR, name))
+
+
+def _index_files(store_dir, manifest):
+    """Return the shard files of the store's index, splitting a single-file index up if needed."""
+    if isinstance(manifest["index"], list):
+        return manifest["index"], {}
+    shards = [_empty_shard() for _ in range(INDEX_SHARDS)]
+    if manifest["index"] is not None:
+        # Stores written before the index was sharded: split it once, on their next refresh
+        index = pd.read_parquet(os.path.join(store_dir, manifest["index"]))
+        entries = _entries(index.index, index["part"], index["row"])
+        shard_of = index_shard(entries["id"])
+        for shard in np.unique(shard_of):
+            shards[shard] = _sorted(entries[shard_of == shard])
+    # Every shard is rewritten by the refresh, including the empty ones
+    return [None] * INDEX_SHARDS, dict(enumerate(shards))
+
+
+def read_index(store_dir=STORE_DIR, manifest=None):
+    """Return the Customer ID -> (part, row) index of the live rows."""
+    manifest = manifest or _read_manifest(store_dir)
+    if manifest["index"] is None:
+        return pd.DataFrame({"part": pd.Series(dtype=np.int32), "row": pd.Series(dtype=np.int64)},
+                            index=pd.Index([], name=ID_COL, dtype=object))
+    if not isinstance(manifest["index"], list):
+        return pd.read_parquet(os.path.join(store_dir, manifest["index"]))
+    shards = [_read_shard(store_dir, name) for name in manifest["index"]]
+    # Shards are only as wide as their own longest ID
+    dtype = _entry_dtype(*shards)
+    entries = np.concatenate([entries.astype(dtype) for entries in shards])
+    return pd.DataFrame({"part": entries["part"], "row": entries["row"]},
+                        index=pd.Index(entries["id"].astype(object), name=ID_COL))
+
+
+def load_aggregates(store_dir=STORE_DIR, manifest=None):
+    """Return the ``ChurnAggregates`` of the store's live rows."""
+    manifest = manifest or _read_manifest(store_dir)
+    if manifest["aggregates"] is None:
+        return ChurnAggregates()
+    with open(os.path.join(store_dir, manifest["aggregates"]), "rb") as f:
+        return pickle.load(f)
+
+
+def load_store_cube(store_dir=STORE_DIR, manifest=None):
+    """Return the ``ChurnCube`` of the store's live rows."""
+    manifest = manifest or _read_manifest(store_dir)
+    # Stores seeded before the cube existed have no entry; build it from the live rows once
+    if manifest.get("cube") is None:
+        return ChurnCube.from_frame(read_store(store_dir)) if manifest["parts"] else ChurnCube()
+    with open(os.path.join(store_dir, manifest["cube"]), "rb") as f:
+        cube = pickle.load(f)
+    # A cube pickled by an earlier version is rebuilt from the live rows too
+    if not is_current(cube):
+        cube = ChurnCube.from_frame(read_store(store_dir))
+    return cube
+
+
+def _read_rows(store_dir, part, rows):
+    """Read the given sorted row positions of a part, touching only their row groups."""
+    rows = np.asarray(rows, dtype=np.int64)
+    parquet = pq.ParquetFile(os.path.join(store_dir, part))
+    sizes = [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)]
+    starts = np.concatenate([[0], np.cumsum(sizes)])
+    group_of = np.searchsorted(starts, rows, side="right") - 1
+    groups = np.unique(group_of)
+    table = parquet.read_row_groups(groups.tolist())
+    # Translate file positions into positions within the row groups that were read
+    offsets = np.concatenate([[0], np.cumsum([sizes[g] for g in groups])])
+    local = offsets[np.searchsorted(groups, group_of)] + rows - starts[group_of]
+    return table.take(local).to_pandas()
+
+
+def refresh(batch, store_dir=STORE_DIR):
+    """Upsert a raw batch (frame or CSV path) into the store by Customer ID.
+
+    Returns counts of new and updated customers plus the elapsed time.
+    """
+    start = time.perf_counter()
+    if not isinstance(batch, pd.DataFrame):
+        batch = pd.read_csv(batch)
+    rows = prepare_frame(to_ml_ready(batch))
+    rows = rows.drop_duplicates(ID_COL, keep="last").reset_index(drop=True)
+
+    os.makedirs(os.path.join(store_dir, INDEX_DIR), exist_ok=True)
+    manifest = _read_manifest(store_dir)
+    aggregates = load_aggregates(store_dir, manifest)
+    cube = load_store_cube(store_dir, manifest)
+    generation = manifest["generation"] + 1
+    part_no = len(manifest["parts"])
+
+    # Look the batch up in the shards it falls into and point its customers at the new part
+    previous_files, shards = _index_files(store_dir, manifest)
+    added = _entries(rows[ID_COL], part_no, np.arange(len(rows)))
+    shard_of = index_shard(added["id"], len(previous_files))
+    superseded = {"part": [], "row": []}
+    for shard in np.unique(shard_of):
+        entries = shards[shard] if shard in shards else _read_shard(store_dir, previous_files[shard])
+        batch_entries = added[shard_of == shard]
+        positions = np.searchsorted(entries["id"], batch_entries["id"])
+        found = positions < len(entries)
+        found[found] = entries["id"][positions[found]] == batch_entries["id"][found]
+        for field in superseded:
+            superseded[field].append(entries[field][positions[found]])
+        dtype = _entry_dtype(entries, added)
+        merged = np.concatenate([np.delete(entries, positions[found]).astype(dtype), batch_entries.astype(dtype)])
+        shards[shard] = _sorted(merged)
+    superseded = pd.DataFrame({field: np.concatenate(values) if values else np.array([], dtype=np.int64)
+                               for field, values in superseded.items()})
+
+    # Take the superseded versions of updated customers back out of the aggregates and cube
+    for part, group in superseded.groupby("part"):
+        rows_in_part = np.sort(group["row"].to_numpy(dtype=np.int64))
+        previous = _read_rows(store_dir, manifest["parts"][int(part)], rows_in_part)
+        aggregates.remove(previous)
+        cube.remove(previous)
+    aggregates.update(rows)
+    cube.update(rows)
+
+    part = f"part-{part_no:05d}.parquet"
+    _write_atomic(os.path.join(store_dir, part),
+                  lambda tmp: rows.to_parquet(tmp, index=False, row_group_size=ROW_GROUP_ROWS))
+
+    index_files = list(previous_files)
+    for shard, entries in shards.items():
+        # A new name per generation, so the previous manifest's shards stay intact until it is replaced
+        index_files[shard] = f"{shard:04d}-{generation:05d}.npy"
+
+        def save(tmp, entries=entries):
+            with open(tmp, "wb") as f:
+                np.save(f, entries)
+        _write_atomic(os.path.join(store_dir, INDEX_DIR, index_files[shard]), save)
+
+    aggregates_file = f"aggregates-{generation:05d}.pkl"
+    cube_file = f"cube-{generation:05d}.pkl"
+
+    for name, value in ((aggregates_file, aggregates), (cube_file, cube)):
+        def dump(tmp, value=value):
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f)
+        _write_atomic(os.path.join(store_dir, name), dump)
+
+    # The manifest is written last, so a crash mid-refresh leaves the previous generation intact
+    manifest = {"generation": generation, "parts": manifest["parts"] + [part],
+                "index": index_files, "aggregates": aggregates_file, "cube": cube_file,
+                "rows": manifest["rows"] + len(rows) - len(superseded)}
+
+    def dump_manifest(tmp):
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+    _write_atomic(os.path.join(store_dir, MANIFEST_FILE), dump_manifest)
+
+    for pattern, keep in (("index-*.parquet", None), ("aggregates-*.pkl", aggregates_file),
+                          ("cube-*.pkl", cube_file)):
+        for stale in glob.glob(os.path.join(store_dir, pattern)):
+            if os.path.basename(stale) != keep:
+                os.remove(stale)
+    for shard in shards:
+        if previous_files[shard] is not None:
+            os.remove(os.path.join(store_dir, INDEX_DIR, previous_files[shard]))
+
+    return {
+        "new": len(rows) - len(superseded),
+        "updated": len(superseded),
+        "rows": manifest["rows"],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def read_store(store_dir=STORE_DIR):
+    """Return the live rows of the store as a prepared frame, without Customer ID."""
+    manifest = _read_manifest(store_dir)
+    if not manifest["parts"]:
+        raise FileNotFoundError(f"No incremental store at {store_dir}")
+    index = read_index(store_dir, manifest)
+
+    frames = []
+    for part_no, live in index.groupby("part")["row"]:
+        frames.append(_read_rows(store_dir, manifest["parts"][int(part_no)], np.sort(live.to_numpy())))
+    df = pd.concat(frames, ignore_index=True).drop(columns=[ID_COL])
+    # Parts carry their own category sets, which concat turns back into objects
+    df = apply_schema(df)
+    df["Quarter"] = df["Quarter"].astype("category")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the incremental customer store.")
+    parser.add_argument("command", choices=["seed", "refresh"])
+    parser.add_argument("batch", nargs="?", default=RAW_PATH, help="raw extract in the telco.csv schema")
+    parser.add_argument("--store", default=STORE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "seed" and _read_manifest(args.store)["parts"]:
+        parser.error(f"{args.store} already exists; use refresh to add data")
+    stats = refresh(args.batch, args.store)
+    print(f"{stats['new']:,} new, {stats['updated']:,} updated customers; "
+          f"{stats['rows']:,} in store ({stats['seconds']:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
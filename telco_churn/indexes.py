@@ -0,0 +1,190 @@
+"""Precomputed indexes for the sidebar filter columns.
+
+``BitmapIndex`` keeps one packed bitmap per distinct value of a low-cardinality
+column, so a multiselect resolves to an OR of a few bitmaps. ``SortedRangeIndex``
+keeps the sorted distinct values of a numeric column plus prefix bitmaps (or a
+sort permutation for wide columns), so an inclusive range resolves to two
+binary searches and one bitmap operation.
+Both are built once per dataset and combined with bitwise ANDs by
+``FilterEngine``. A ``SortedRangeIndex`` can also be saved next to the
+memory-mapped column export and mapped back, so that server processes share
+one copy of it instead of each building their own.
+"""
+
+import functools
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+def bitmap_to_mask(bitmap, n_rows):
+    return np.unpackbits(bitmap, count=n_rows).view(bool)
+
+
+class BitmapIndex:
+    """Packed bitmaps per distinct value, in order of first appearance.
+
+    Missing values have no bitmap, so no selection matches them.
+    """
+
+    def __init__(self, series):
+        self.n_rows = len(series)
+        codes, uniques = pd.factorize(series)
+        self.values = list(uniques)
+        self.complete = not (codes < 0).any()
+        self.bitmaps = {
+            value: np.packbits(codes == code)
+            for code, value in enumerate(self.values)
+        }
+
+    def lookup(self, selected):
+        """Return a new bitmap of rows whose value is in ``selected``, or ``None`` if that is every row."""
+        if self.complete and all(value in selected for value in self.values):
+            return None
+        bitmaps = [self.bitmaps[value] for value in selected if value in self.bitmaps]
+        if not bitmaps:
+            return np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        return np.bitwise_or.reduce(bitmaps) if len(bitmaps) > 1 else bitmaps[0].copy()
+
+
+class SortedRangeIndex:
+    """Sorted values of a numeric column with prefix bitmaps or a sort permutation.
+
+    Columns with at most ``MAX_PREFIX_VALUES`` distinct values (ages, tenures)
+    keep one cumulative bitmap per distinct value, ``prefix[i]`` marking rows
+    with ``value <= distinct[i]``; a range is then ``prefix[hi] & ~prefix[lo - 1]``.
+    Wider columns keep a stable sort permutation and scatter the matching slice.
+    Missing values are left out of ``distinct``, the bitmaps and ``sorted`` (they
+    sort last in the permutation), so they fall outside every range and the
+    bounds, as with ``Series.between`` and ``min``/``max``.
+
+    The prefix bitmaps take ``len(distinct) / 8`` bytes per row: about 7.75 for
+    Age and 9 for Tenure, 168 MB for the two at ten million rows. A permutation
+    takes 8 bytes per row plus the sorted values. ``open`` keeps them in ``.npy``
+    files mapped read-only, so that memory is page cache shared by every
+    process rather than private to each.
+    """
+
+    MAX_PREFIX_VALUES = 256
+
+    # Arrays saved by ``save`` and mapped back by ``open``
+    ARRAYS = ("distinct", "prefix", "order", "sorted")
+
+    def __init__(self, series=None):
+        self.n_rows = 0
+        self.distinct = self.prefix = self.order = self.sorted = None
+        if series is None:
+            return
+        values = series.to_numpy()
+        self.n_rows = len(values)
+        # NaNs sort last, and are cut off the sorted values
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order[:self.n_rows - int(pd.isna(values).sum())]]
+        starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])[:len(sorted_values)]
+        self.distinct = sorted_values[starts]
+
+        if len(self.distinct) <= self.MAX_PREFIX_VALUES:
+            # (len(distinct), bytes per bitmap), one row per prefix
+            self.prefix = np.empty((len(starts), (self.n_rows + 7) // 8), dtype=np.uint8)
+            mask = np.zeros(self.n_rows, dtype=bool)
+            stops = np.r_[starts[1:], len(sorted_values)]
+            for i, (start, stop) in enumerate(zip(starts, stops)):
+                mask[order[start:stop]] = True
+                self.prefix[i] = np.packbits(mask)
+        else:
+            self.order = order
+            self.sorted = sorted_values
+
+    @classmethod
+    def open(cls, series, directory):
+        """Return the index of ``series`` mapped from ``directory``, saving it there first if needed.
+
+        Falls back to an index in memory when ``directory`` can't be written.
+        """
+        index = cls.load(directory, len(series))
+        if index is None:
+            index = cls(series)
+            # An index of other data, or saved with its missing values in it: replaced
+            shutil.rmtree(directory, ignore_errors=True)
+            try:
+                index.save(directory)
+            except OSError:
+                return index
+            index = cls.load(directory, len(series)) or index
+        return index
+
+    @classmethod
+    def load(cls, directory, n_rows):
+        """Return the index saved in ``directory`` with its arrays memory-mapped, or ``None``."""
+        index = cls()
+        index.n_rows = n_rows
+        for name in cls.ARRAYS:
+            path = os.path.join(directory, f"{name}.npy")
+            if os.path.exists(path):
+                setattr(index, name, np.load(path, mmap_mode="r"))
+        if index.distinct is None or (len(index.distinct) and pd.isna(index.distinct[-1])):
+            return None
+        if index.prefix is not None and index.prefix.shape[1] != (n_rows + 7) // 8:
+            return None
+        if index.order is not None and len(index.order) != n_rows:
+            return None
+        return index
+
+    def save(self, directory):
+        """Write the index's arrays into ``directory`` atomically."""
+        tmp = f"{directory}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        # Not makedirs: without the column export there is nothing to save the index next to
+        os.mkdir(tmp)
+        for name in self.ARRAYS:
+            array = getattr(self, name)
+            if array is not None:
+                np.save(os.path.join(tmp, f"{name}.npy"), array, allow_pickle=False)
+        try:
+            os.replace(tmp, directory)
+        except OSError:
+            # Another process saved the same index first; use theirs
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.exists(os.path.join(directory, "distinct.npy")):
+                raise
+
+    @property
+    def bounds(self):
+        return self.distinct[0], self.distinct[-1]
+
+    @functools.cached_property
+    def complete(self):
+        """Whether no value is missing, so that a range over all of ``distinct`` is every row."""
+        if self.prefix is not None:
+            return bool(bitmap_to_mask(self.prefix[-1], self.n_rows).all()) if len(self.prefix) else not self.n_rows
+        return len(self.sorted) == self.n_rows
+
+    def lookup(self, low, high):
+        """Return a bitmap of rows within the inclusive range, or ``None`` if that is every row."""
+        if self.prefix is not None:
+            first = np.searchsorted(self.distinct, low, side="left")
+            last = np.searchsorted(self.distinct, high, side="right") - 1
+            if first == 0 and last == len(self.distinct) - 1 and self.complete:
+                return None
+            if last < first:
+                return np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            if first == 0:
+                return self.prefix[last].copy()
+            return np.bitwise_and(self.prefix[last], np.invert(self.prefix[first - 1]))
+
+        start = np.searchsorted(self.sorted, low, side="left")
+        stop = np.searchsorted(self.sorted, high, side="right")
+        if start == 0 and stop == self.n_rows:
+            return None
+        if stop - start > self.n_rows // 2:
+            # Clearing the rows outside the range touches fewer positions than setting those inside;
+            # order[stop:] also holds the rows with a missing value
+            mask = np.ones(self.n_rows, dtype=bool)
+            mask[self.order[:start]] = False
+            mask[self.order[stop:]] = False
+        else:
+            mask = np.zeros(self.n_rows, dtype=bool)
+            mask[self.order[start:stop]] = True
+        return np.packbits(mask)
@@ -0,0 +1,263 @@
+"""Gradient Boosting churn model of the Orange workflow, trained and scored in Python.
+
+``orange_modeling/telco_churn_workflow.ows`` selects the model's columns
+(Select Columns: every ``FEATURES`` attribute, ``Churn Label`` as the class),
+holds out data (Data Sampler: a stratified 84% sample with Orange's fixed
+seed trains, the remaining 16% tests) and fits scikit-learn's Gradient
+Boosting with the widget's settings (``GB_PARAMS``). ``train`` repeats those
+steps on ``dataset/ml_ready_telco.csv``, scores the held-out rows as Test and
+Score does and saves the fitted ``ChurnModel``.
+
+Orange one-hot encodes discrete attributes and imputes missing values with
+the training means before a scikit-learn learner sees them; ``ChurnModel``
+keeps the category sets and means it was trained with so that any later
+table, chunk or single record is encoded the same way. Small batches (the
+service's) are scored by the flat ``TreeEnsemble`` of ``telco_churn.trees``,
+larger ones by scikit-learn in blocks of ``BLOCK_ROWS``, and ``predictions``
+lays the result out with the prediction and feature columns of Orange's
+``prediction/prediction_data.csv``. ``score`` writes to ``PREDICTION_PATH``,
+next to Orange's file rather than over it.
+
+    python -m telco_churn.model train
+    python -m telco_churn.model score --output prediction/gradient_boosting_predictions.csv
+"""
+
+import argparse
+import functools
+import hashlib
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.metrics import accuracy_score, f1_score, log_loss, precision_score, recall_score, roc_auc_score
+from sklearn.model_selection import StratifiedShuffleSplit
+
+from telco_churn.data import SCHEMA, TRUE_VALUES, read_csv
+from telco_churn.trees import TreeEnsemble
+
+ML_READY_PATH = "./dataset/ml_ready_telco.csv"
+MODEL_PATH = os.environ.get("TELCO_MODEL_PATH", "./models/gradient_boosting.pkl")
+PREDICTION_PATH = "./prediction/gradient_boosting_predictions.csv"
+
+# Attributes of the workflow's Select Columns widget, in its order. Customer Status and
+# Churn Score are kept as the workflow kept them, although they all but give the label away
+FEATURES = ["Gender", "Age", "Under 30", "Senior Citizen", "Married", "Dependents",
+            "Number of Dependents", "Population", "Referred a Friend", "Number of Referrals",
+            "Tenure in Months", "Offer", "Phone Service", "Avg Monthly Long Distance Charges",
+            "Multiple Lines", "Internet Service", "Internet Type", "Avg Monthly GB Download",
+            "Online Security", "Online Backup", "Device Protection Plan", "Premium Tech Support",
+            "Streaming TV", "Streaming Movies", "Streaming Music", "Unlimited Data", "Contract",
+            "Paperless Billing", "Payment Method", "Monthly Charge", "Total Charges", "Total Refunds",
+            "Total Extra Data Charges", "Total Long Distance Charges", "Total Revenue",
+            "Satisfaction Score", "Customer Status", "Churn Score", "CLTV", "Tenure in Years",
+            "Total Addon Services"]
+TARGET = "Churn Label"
+CLASS_VALUES = ["No", "Yes"]
+
+# Discrete attributes are one-hot encoded; the boolean ones already are a single indicator
+CATEGORY_FEATURES = [col for col in FEATURES if SCHEMA[col] == "category"]
+
+# Data Sampler: fixed proportion, stratified, Orange's fixed random seed
+SAMPLE_PROPORTION = 0.84
+SAMPLER_SEED = 42
+
+# Gradient Boosting widget, scikit-learn method; "replicable training" fixes the seed at 0
+GB_PARAMS = dict(n_estimators=100, learning_rate=0.1, max_depth=3, min_samples_split=2,
+                 subsample=1.0, random_state=0)
+
+# Column names of the Orange predictions table
+PREDICTION_COL = "Gradient Boosting"
+PROBABILITY_COLS = [f"{PREDICTION_COL} ({value})" for value in CLASS_VALUES]
+
+# Up to this many rows the flat ensemble beats scikit-learn's fixed cost per call
+FLAT_MAX_ROWS = 128
+# Rows per scikit-learn call: beyond a few thousand, its per-tree passes over the
+# whole matrix fall out of cache and every row costs several times more
+BLOCK_ROWS = 4096
+
+
+def numeric_column(series, col):
+    """Return a boolean or numeric feature as float32, with NaN for missing values."""
+    # Yes/No text ("Internet Service" in the CSV) or records parsed without the schema
+    if SCHEMA[col] == "bool" and series.dtype != bool:
+        series = series.isin(TRUE_VALUES).astype(np.float32).mask(series.isna())
+    elif not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors="coerce")
+    return series.to_numpy(dtype=np.float32, na_value=np.nan)
+
+
+class ChurnModel:
+    """A fitted estimator together with the encoding of the features it was trained on."""
+
+    def __init__(self, categories, means):
+        # column: category values in the order of their indicator columns
+        self.categories = categories
+        # column: training mean filled in for missing values
+        self.means = means
+        self.estimator = None
+        self.version = None
+
+    @classmethod
+    def from_frame(cls, df):
+        """Fit a model on the labelled rows of ``df``, taking its encoding from them."""
+        categories = {col: sorted(df[col].dropna().unique().tolist()) for col in CATEGORY_FEATURES}
+        means = {col: float(np.nanmean(numeric_column(df[col], col))) for col in FEATURES if col not in categories}
+        return cls(categories, means).fit(df)
+
+    def fit(self, df):
+        y = (df[TARGET] == CLASS_VALUES[1]).to_numpy(dtype=np.int8)
+        self.estimator = GradientBoostingClassifier(**GB_PARAMS).fit(self.encode(df), y)
+        self.__dict__.pop("trees", None)
+        # A short key that changes whenever the fitted model does
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(pickle.dumps((self.estimator, self.categories, self.means)))
+        self.version = digest.hexdigest()
+        return self
+
+    @functools.cached_property
+    def trees(self):
+        # Derived from the estimator on first use, so models saved before it existed load as they are
+        return TreeEnsemble.from_gradient_boosting(self.estimator)
+
+    @property
+    def feature_names(self):
+        names = []
+        for col in FEATURES:
+            if col in self.categories:
+                names.extend(f"{col}={value}" for value in self.categories[col])
+            else:
+                names.append(col)
+        return names
+
+    def encode(self, df):
+        """Return the float32 model matrix of the ``FEATURES`` of ``df``.
+
+        The trees compare in float32, so nothing is lost by building the
+        matrix in that type. Categories unseen in training encode as all zeros.
+        """
+        X = np.zeros((len(df), len(self.feature_names)), dtype=np.float32)
+        offset = 0
+        for col in FEATURES:
+            if col in self.categories:
+                values = self.categories[col]
+                codes = pd.Categorical(df[col], categories=values).codes
+                known = np.flatnonzero(codes >= 0)
+                X[known, offset + codes[known]] = 1
+                offset += len(values)
+            else:
+                column = numeric_column(df[col], col)
+                X[:, offset] = np.where(np.isnan(column), self.means[col], column)
+                offset += 1
+        return X
+
+    def predict_proba(self, df):
+        """Return the ``CLASS_VALUES`` probabilities of every row of ``df``."""
+        return self.predict_proba_encoded(self.encode(df))
+
+    def predict_proba_encoded(self, X):
+        """Return the ``CLASS_VALUES`` probabilities of the rows of the model matrix ``X``."""
+        if len(X) <= FLAT_MAX_ROWS:
+            return self.trees.predict_proba(X)
+        return np.concatenate([
+            self.estimator.predict_proba(X[start:start + BLOCK_ROWS]) for start in range(0, len(X), BLOCK_ROWS)
+        ])
+
+    def predictions(self, df, proba=None):
+        """Return the predicted class and probabilities of ``df`` followed by its features.
+
+        The columns are ``Gradient Boosting``, ``Gradient Boosting (No)``,
+        ``Gradient Boosting (Yes)`` and then ``FEATURES``, named and ordered as
+        in Orange's ``prediction/prediction_data.csv``. Orange's file also
+        starts with the ``Churn Label`` class and has a ``Gradient Boosting
+        (error)`` column (one minus the probability of the true class); both
+        need the known label, so they are left out.
+        ``proba`` may pass probabilities already computed for ``df``.
+        """
+        if proba is None:
+            proba = self.predict_proba(df)
+        out = pd.DataFrame({PREDICTION_COL: np.asarray(CLASS_VALUES)[proba.argmax(axis=1)]}, index=df.index)
+        for i, col in enumerate(PROBABILITY_COLS):
+            out[col] = proba[:, i]
+        return pd.concat([out, df[FEATURES]], axis=1)
+
+
+def sample_split(y):
+    """Return the training and held-out positions the Data Sampler widget produces."""
+    split = StratifiedShuffleSplit(n_splits=1, train_size=SAMPLE_PROPORTION,
+                                   test_size=1 - SAMPLE_PROPORTION, random_state=SAMPLER_SEED)
+    return next(split.split(np.zeros(len(y)), y))
+
+
+def evaluate(model, df):
+    """Return Test and Score's classification metrics of ``model`` on ``df``."""
+    y = (df[TARGET] == CLASS_VALUES[1]).to_numpy(dtype=np.int8)
+    proba = model.predict_proba(df)[:, 1]
+    predicted = (proba > 0.5).astype(np.int8)
+    return {
+        "AUC": roc_auc_score(y, proba),
+        "CA": accuracy_score(y, predicted),
+        "F1": f1_score(y, predicted),
+        "Precision": precision_score(y, predicted, zero_division=0),
+        "Recall": recall_score(y, predicted),
+        "LogLoss": log_loss(y, proba, labels=[0, 1]),
+    }
+
+
+def train(path=ML_READY_PATH):
+    """Fit the workflow's model on its training sample; return it with the held-out metrics."""
+    df = read_csv(path)
+    df = df[df[TARGET].notna()].reset_index(drop=True)
+    train_rows, test_rows = sample_split((df[TARGET] == CLASS_VALUES[1]).to_numpy())
+    model = ChurnModel.from_frame(df.iloc[train_rows])
+    return model, evaluate(model, df.iloc[test_rows])
+
+
+def save_model(model, path=MODEL_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_model(path=MODEL_PATH):
+    """Load a model saved by ``train``; raises ``FileNotFoundError`` if there is none."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No model at {path}; run `python -m telco_churn.model train` first")
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or apply the Gradient Boosting churn model.")
+    parser.add_argument("command", choices=["train", "score"])
+    parser.add_argument("--data", default=ML_READY_PATH, help="table in the ml_ready_telco.csv schema")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--output", default=PREDICTION_PATH, help="predictions CSV written by score")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "train":
+        model, metrics = train(args.data)
+        save_model(model, args.model)
+        print(f"trained model {model.version} in {time.perf_counter() - start:.2f}s, saved to {args.model}")
+        print("held-out " + ", ".join(f"{name} {value:.3f}" for name, value in metrics.items()))
+        return
+
+    model = load_model(args.model)
+    df = read_csv(args.data)
+    read_s = time.perf_counter() - start
+    predictions = model.predictions(df)
+    score_s = time.perf_counter() - start - read_s
+    predictions.to_csv(args.output, index=False)
+    print(f"scored {len(df):,} customers with model {model.version} in {score_s:.2f}s "
+          f"({len(df) / score_s:,.0f} rows/s; read {read_s:.2f}s), wrote {args.output}")
+
+
+if __name__ == "__main__":
+    # Through the package module, so that saved models unpickle as telco_churn.model.ChurnModel
+    from telco_churn.model import main
+    main()
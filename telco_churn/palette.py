@@ -0,0 +1,28 @@
+"""Color palette of the dashboard's dark theme.
+
+Kept free of imports so that the stylesheet (``telco_churn.styles``) and the
+dashboard script can use the colors without loading Plotly; the figure
+builders in ``telco_churn.charts`` use the same palette.
+"""
+
+# Dark-themed color palette with high contrast
+COLORS = {
+    'primary': '#e5e7eb',        # Light gray for text
+    'secondary': '#9ca3af',      # Mid gray for secondary text
+    'accent': '#4f46e5',         # Indigo for highlights
+    'success': '#10b981',        # Vibrant emerald for positive metrics
+    'warning': '#f59e0b',        # Amber for warnings
+    'danger': '#ef4444',         # Red for negative metrics
+    'info': '#3b82f6',           # Blue for informational elements
+    'light': '#f8fafc',          # Near-white for accents
+    'dark': '#111827',           # Deep dark gray for background
+    'muted': '#6b7280',          # Muted gray for subtle text
+    'background': '#000000',     # Solid black background
+    'surface': '#1f2937',        # Slightly lighter dark gray for cards
+    'border': '#4b5563',         # Darker gray for borders
+    'gradient_start': '#4f46e5', # Indigo gradient start
+    'gradient_end': '#06b6d4'    # Cyan gradient end
+}
+
+STATUS_COLORS = {'Churned': COLORS['danger'], 'Retained': COLORS['success']}
+CHURN_RATE_SCALE = [[0, COLORS['success']], [1, COLORS['danger']]]
@@ -0,0 +1,242 @@
+"""Persistent cache of churn scores, keyed by the encoded features of a customer.
+
+Between monthly refreshes most customers' features do not change, and their
+score can't either. ``score_file`` hashes every encoded row (``row_keys``:
+64 bits over the float32 model matrix, so formatting differences in the CSV
+don't matter), takes the probabilities of known rows from the cache and only
+evaluates the trees on new or changed ones.
+
+The cache of a model is the directory ``SCORE_CACHE_DIR/scores-<model version>.cache``;
+retraining starts a new one and removes the old. Like the incremental store,
+it is append-only: each run adds one Parquet part with the scores it computed,
+so writing it costs as much as the changed rows, not the whole cache.
+``CacheWriter`` appends each chunk's scores to that part as the chunk is
+done, so a run holds no more than one chunk of them whatever the size of the
+file. The oldest parts are dropped once the cache holds more than
+``MAX_ROWS`` rows, and the parts are merged into one once there are more
+than ``MAX_PARTS``.
+
+``ScoreCache`` keeps the keys sorted, next to their probabilities, and looks
+rows up with a binary search. ``share`` writes the two arrays out as ``.npy``
+files that scoring workers map with ``ScoreCache.open``, so a process pool
+holds one copy of the cache in the page cache instead of one per worker.
+
+Two different rows share a key with a probability of about n²/2⁶⁵, around
+one in 10⁶ for a cache of ten million customers.
+"""
+
+import glob
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from telco_churn.data import SNAPSHOT_DIR, remove_stale
+from telco_churn.model import BLOCK_ROWS
+
+SCORE_CACHE_DIR = os.environ.get("TELCO_SCORE_CACHE_DIR", SNAPSHOT_DIR)
+MAX_ROWS = int(os.environ.get("TELCO_SCORE_CACHE_ROWS", 10_000_000))
+MAX_PARTS = 16
+
+_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def cache_path(version, cache_dir=SCORE_CACHE_DIR):
+    return os.path.join(cache_dir, f"scores-{version}.cache")
+
+
+def row_keys(X):
+    """Return a stable 64-bit key for every row of the float32 model matrix ``X``."""
+    X = np.asarray(X, dtype=np.float32)
+    if X.shape[1] % 2:
+        # Hashed as 64-bit words, two features at a time
+        X = np.pad(X, ((0, 0), (0, 1)))
+    keys = np.empty(len(X), dtype=np.uint64)
+    for start in range(0, len(X), BLOCK_ROWS):
+        # Block by block so that the transposed words stay in cache
+        words = np.ascontiguousarray(X[start:start + BLOCK_ROWS]).view(np.uint64)
+        block = np.full(len(words), X.shape[1], dtype=np.uint64)
+        for column in np.ascontiguousarray(words.T):
+            block ^= column
+            block *= _MULTIPLIER
+            block ^= block >> np.uint64(29)
+        # Final avalanche (splitmix64), so that every input bit reaches every key bit
+        block ^= block >> np.uint64(31)
+        block *= np.uint64(0xBF58476D1CE4E5B9)
+        block ^= block >> np.uint64(27)
+        keys[start:start + len(words)] = block
+    return keys
+
+
+def _parts(path):
+    """Return the ``(run, rows, file)`` of every part of the cache at ``path``, oldest first."""
+    parts = []
+    for part in glob.glob(os.path.join(glob.escape(path), "part-*.parquet")):
+        _, run, rows = os.path.basename(part)[:-len(".parquet")].split("-")
+        parts.append((int(run), int(rows), part))
+    return sorted(parts)
+
+
+def read_cache(path):
+    """Return the keys and positive-class probabilities cached at ``path``, oldest first."""
+    frames = []
+    for _, _, part in _parts(path):
+        try:
+            frames.append(pd.read_parquet(part))
+        except Exception:
+            # Removed by a concurrent run, or truncated: those rows are simply scored again
+            pass
+    if not frames:
+        return pd.DataFrame({"key": np.array([], dtype=np.uint64), "proba": np.array([])})
+    return pd.concat(frames, ignore_index=True)
+
+
+def _write_part(path, run, df):
+    part = os.path.join(path, f"part-{run:05d}-{len(df)}.parquet")
+    tmp = f"{part}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, part)
+
+
+class ScoreCache:
+    """Read-only lookup of the positive-class probability by row key."""
+
+    def __init__(self, path=None, keys=None, proba=None):
+        """Load the cache at ``path``, or wrap already sorted ``keys`` and their ``proba``."""
+        start = time.perf_counter()
+        if path is not None:
+            cached = read_cache(path)
+            # Reversed, so that np.unique's first occurrence is the latest score of a row: a row
+            # scored again by a later run, or added twice by concurrent runs, takes the newer part's
+            keys, latest = np.unique(cached["key"].to_numpy(dtype=np.uint64)[::-1], return_index=True)
+            proba = cached["proba"].to_numpy()[::-1][latest]
+        self._keys = np.empty(0, dtype=np.uint64) if keys is None else keys
+        self._proba = np.empty(0) if proba is None else proba
+        # Seconds the model takes per row, measured on the first matrix scored through the cache
+        self.row_seconds = None
+        # Charged against the savings of the first lookup
+        self._overhead = time.perf_counter() - start
+
+    @classmethod
+    def open(cls, directory):
+        """Map a cache written by ``share`` read-only."""
+        return cls(keys=np.load(os.path.join(directory, "keys.npy"), mmap_mode="r"),
+                   proba=np.load(os.path.join(directory, "proba.npy"), mmap_mode="r"))
+
+    def share(self, directory):
+        """Write the cache's arrays into ``directory`` for ``open``."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "keys.npy"), self._keys, allow_pickle=False)
+        np.save(os.path.join(directory, "proba.npy"), self._proba, allow_pickle=False)
+
+    def __len__(self):
+        return len(self._proba)
+
+    def predict_proba(self, model, X):
+        """Return the ``(n, 2)`` probabilities of ``X`` and a dict describing the lookup.
+
+        Only the rows the cache misses are passed to the model. The dict holds
+        their ``keys`` and positive ``proba`` to add to the cache, the number of
+        ``hits`` and the ``saved_seconds`` they spared, net of loading the
+        cache, hashing and looking up.
+        """
+        start = time.perf_counter()
+        if self.row_seconds is None:
+            sample = X[:BLOCK_ROWS]
+            model.predict_proba_encoded(sample)
+            self.row_seconds = (time.perf_counter() - start) / max(len(sample), 1)
+
+        keys = row_keys(X)
+        # Searching in key order walks the cached keys front to back, about twice as fast as
+        # searching for them in row order
+        order = np.argsort(keys)
+        positions = np.empty(len(keys), dtype=np.intp)
+        positions[order] = np.searchsorted(self._keys, keys[order])
+        positions = np.minimum(positions, max(len(self._keys) - 1, 0))
+        hit = self._keys[positions] == keys if len(self._keys) else np.zeros(len(keys), dtype=bool)
+        positive = np.empty(len(X))
+        positive[hit] = self._proba[positions[hit]]
+        overhead = time.perf_counter() - start + self._overhead
+        self._overhead = 0.0
+
+        miss = ~hit
+        if miss.any():
+            positive[miss] = model.predict_proba_encoded(X[miss])[:, 1]
+        hits = int(hit.sum())
+        return np.column_stack([1 - positive, positive]), {
+            "keys": keys[miss],
+            "proba": positive[miss],
+            "hits": hits,
+            "saved_seconds": hits * self.row_seconds - overhead,
+        }
+
+
+class CacheWriter:
+    """Append the scores of one run to the cache at ``path`` as a single new part, chunk by chunk."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._writer = None
+        self._tmp = None
+
+    def write(self, keys, proba):
+        """Add the ``keys`` and positive-class ``proba`` of the rows scored in one chunk."""
+        if not len(keys):
+            return
+        # A customer listed twice in a chunk is missed, and scored, twice; across chunks
+        # the duplicates are dropped when the cache is read
+        keys, first = np.unique(keys, return_index=True)
+        table = pa.table({"key": keys, "proba": np.asarray(proba)[first]})
+        if self._writer is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._tmp = os.path.join(self.path, f"part.{os.getpid()}.tmp")
+            self._writer = pq.ParquetWriter(self._tmp, table.schema)
+        self._writer.write_table(table)
+        self.rows += len(keys)
+
+    def close(self, max_rows=MAX_ROWS):
+        """Publish the part, trim the cache to ``max_rows`` and return its size in rows."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            parts = _parts(self.path)
+            run = parts[-1][0] + 1 if parts else 0
+            os.replace(self._tmp, os.path.join(self.path, f"part-{run:05d}-{self.rows}.parquet"))
+            remove_stale(self.path)
+        return _trim(self.path, max_rows)
+
+    def abort(self):
+        """Drop the part of a run that failed."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            os.remove(self._tmp)
+
+
+def update_cache(path, keys, proba, max_rows=MAX_ROWS):
+    """Add the scores of this run to the cache at ``path`` and return its size in rows."""
+    writer = CacheWriter(path)
+    writer.write(keys, proba)
+    return writer.close(max_rows)
+
+
+def _trim(path, max_rows):
+    """Drop the oldest parts past ``max_rows`` and merge them past ``MAX_PARTS``; return the rows kept."""
+    parts = _parts(path)
+    total = sum(rows for _, rows, _ in parts)
+    while len(parts) > 1 and total > max_rows:
+        _, rows, part = parts.pop(0)
+        os.remove(part)
+        total -= rows
+
+    if len(parts) > MAX_PARTS:
+        merged = read_cache(path).drop_duplicates("key", keep="last")
+        _write_part(path, parts[-1][0] + 1, merged)
+        for _, _, part in parts:
+            os.remove(part)
+        total = len(merged)
+    return total
@@ -0,0 +1,213 @@
+"""Parallel batch scoring of customer files of any size.
+
+``score_file`` reads the input ``CHUNK_BYTES`` of whole lines at a time and
+hands the raw text of each chunk to a process pool. Every worker loads the
+model once, then parses its chunks, scores them and formats the output rows
+itself, so the parent does little more than move bytes: parsing and CSV
+formatting cost more than the trees and now run on every core. At most
+``MAX_PENDING`` chunks per worker are in flight and the results are appended
+to the output in input order as they complete, which keeps memory bounded by
+the chunk size whatever the size of the file.
+
+The output has the prediction and feature columns of Orange's
+``prediction/prediction_data.csv``, without its class and error columns (see
+``ChurnModel.predictions``), with the feature fields copied from the input as
+they were written there.
+
+Rows scored before by the same model are taken from the persistent score
+cache (``telco_churn.score_cache``) instead of the trees, and the run reports
+the cache's hit rate and the time it saved; ``--no-cache`` scores every row.
+The parent loads the cache once and shares it with the workers as memory
+maps, and appends the scores of the rows it missed to the cache chunk by
+chunk as the results come in.
+
+    python -m telco_churn.scoring customers.csv scores.csv --workers 8
+
+Lines are split on newlines, so quoted fields must not contain them; the
+ml-ready files never do.
+"""
+
+import argparse
+import collections
+import io
+import operator
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from telco_churn.data import read_dtypes
+from telco_churn.model import CLASS_VALUES, FEATURES, MODEL_PATH, PREDICTION_COL, PROBABILITY_COLS, load_model
+from telco_churn.score_cache import SCORE_CACHE_DIR, CacheWriter, ScoreCache, cache_path
+
+CHUNK_BYTES = int(os.environ.get("TELCO_SCORE_CHUNK_BYTES", 16 * 2**20))
+
+# Chunks queued or being scored per worker; the parent waits before reading further
+MAX_PENDING = 2
+
+OUTPUT_COLUMNS = [PREDICTION_COL, *PROBABILITY_COLS, *FEATURES]
+
+_model = None
+_cache = None
+
+
+def _load_worker(model_path, shared_cache=None):
+    global _model, _cache
+    _model = load_model(model_path)
+    _cache = ScoreCache.open(shared_cache) if shared_cache else None
+
+
+def score_text(header, text, model=None, cache=None):
+    """Score one chunk of CSV ``text`` (without its ``header`` line).
+
+    Return the output rows as CSV together with the lookup of the score
+    cache (see ``ScoreCache.predict_proba``), or ``None`` without a cache.
+    """
+    model = model or _model
+    cache = cache if cache is not None else _cache
+    try:
+        df = pd.read_csv(io.StringIO(header + text), dtype=read_dtypes())
+    except (ValueError, TypeError):
+        # e.g. a blank in a bool column, as in data.read_csv; encode coerces the inferred columns
+        df = pd.read_csv(io.StringIO(header + text))
+    if cache is None:
+        proba, lookup = model.predict_proba(df), None
+    else:
+        proba, lookup = cache.predict_proba(model, model.encode(df))
+    lines = text.splitlines()
+    if '"' in text or len(lines) != len(df):
+        # Quoted fields or blank lines: the rows can't be cut out of the text by splitting
+        return model.predictions(df, proba).to_csv(index=False, header=False), lookup
+
+    # Formatting the features back out is most of the cost of to_csv, and they are already
+    # text in the input: copy their fields after the prediction
+    labels = np.asarray(CLASS_VALUES)[proba.argmax(axis=1)].tolist()
+    columns = header.rstrip("\r\n").split(",")
+    features = operator.itemgetter(*[columns.index(col) for col in FEATURES])
+    return "".join(
+        f"{label},{no!r},{yes!r},{','.join(features(line.split(',')))}\n"
+        for label, no, yes, line in zip(labels, proba[:, 0].tolist(), proba[:, 1].tolist(), lines)
+    ), lookup
+
+
+def iter_chunks(f, chunk_bytes=CHUNK_BYTES):
+    """Yield the remaining lines of ``f`` joined into chunks of about ``chunk_bytes``."""
+    while True:
+        lines = f.readlines(chunk_bytes)
+        if not lines:
+            return
+        yield "".join(lines)
+
+
+def score_file(input_path, output_path, model_path=MODEL_PATH, workers=None, chunk_bytes=CHUNK_BYTES,
+               cache_dir=SCORE_CACHE_DIR):
+    """Score ``input_path`` into ``output_path`` and return ``{"rows", "seconds"}``.
+
+    ``workers=0`` scores in this process, which is what a single core is
+    best at; the default is one worker per core. Unless ``cache_dir`` is
+    ``None``, rows are looked up in the model's score cache there first and
+    the statistics also hold the cache ``hits``, ``hit_rate``,
+    ``saved_seconds`` and the rows it holds after the run (``cache_rows``).
+    """
+    workers = os.cpu_count() if workers is None else workers
+    start = time.perf_counter()
+    model = load_model(model_path)
+    score_cache = cache_path(model.version, cache_dir) if cache_dir is not None else None
+    tmp = f"{output_path}.{os.getpid()}.tmp"
+    rows = 0
+    cache = writer = shared = None
+    lookups = {"hits": 0, "saved_seconds": 0.0}
+    if score_cache:
+        load_start = time.perf_counter()
+        cache = ScoreCache(score_cache)
+        if workers:
+            shared = tempfile.mkdtemp(prefix="telco-score-cache-")
+            cache.share(shared)
+            # Charged here, once, rather than by each worker's first lookup
+            lookups["saved_seconds"] -= time.perf_counter() - load_start
+            cache = None
+        writer = CacheWriter(score_cache)
+    try:
+        with open(input_path, newline="") as src, open(tmp, "w", newline="") as out:
+            header = src.readline()
+            out.write(pd.DataFrame(columns=OUTPUT_COLUMNS).to_csv(index=False))
+
+            def write(result):
+                nonlocal rows, writer
+                text, lookup = result
+                out.write(text)
+                rows += text.count("\n")
+                if lookup is None:
+                    return
+                lookups["hits"] += lookup["hits"]
+                lookups["saved_seconds"] += lookup["saved_seconds"]
+                if writer is not None:
+                    try:
+                        writer.write(lookup["keys"], lookup["proba"])
+                    except (OSError, ValueError):
+                        # A read-only cache directory only costs the next run its hits
+                        writer.abort()
+                        writer = None
+
+            if workers == 0:
+                for text in iter_chunks(src, chunk_bytes):
+                    write(score_text(header, text, model, cache))
+            else:
+                with ProcessPoolExecutor(workers, initializer=_load_worker,
+                                         initargs=(model_path, shared)) as pool:
+                    pending = collections.deque()
+                    for text in iter_chunks(src, chunk_bytes):
+                        pending.append(pool.submit(score_text, header, text))
+                        if len(pending) >= workers * MAX_PENDING:
+                            write(pending.popleft().result())
+                    while pending:
+                        write(pending.popleft().result())
+        os.replace(tmp, output_path)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        if shared is not None:
+            shutil.rmtree(shared, ignore_errors=True)
+    stats = {"rows": rows}
+    if score_cache:
+        stats.update(hits=lookups["hits"], hit_rate=lookups["hits"] / rows if rows else 0.0)
+        update_start = time.perf_counter()
+        try:
+            stats["cache_rows"] = writer.close() if writer is not None else None
+        except (OSError, ValueError):
+            stats["cache_rows"] = None
+        stats["saved_seconds"] = lookups["saved_seconds"] - (time.perf_counter() - update_start)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a customer file with the churn model.")
+    parser.add_argument("input", help="customers in the ml_ready_telco.csv schema")
+    parser.add_argument("output", help="predictions CSV to write")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes; 0 scores in-process")
+    parser.add_argument("--chunk-bytes", type=int, default=CHUNK_BYTES)
+    parser.add_argument("--cache-dir", default=SCORE_CACHE_DIR, help="directory of the persistent score cache")
+    parser.add_argument("--no-cache", action="store_true", help="score every row with the model")
+    args = parser.parse_args()
+
+    stats = score_file(args.input, args.output, args.model, args.workers, args.chunk_bytes,
+                       None if args.no_cache else args.cache_dir)
+    print(f"scored {stats['rows']:,} customers in {stats['seconds']:.2f}s "
+          f"({stats['rows'] / stats['seconds']:,.0f} rows/s), wrote {args.output}")
+    if "hits" in stats:
+        print(f"score cache: {stats['hits']:,} rows reused ({stats['hit_rate']:.1%} hit rate), "
+              f"{stats['saved_seconds']:+.2f}s of scoring saved net of lookups, {stats['cache_rows'] or 0:,} rows cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Start the dashboard with its process-wide caches already warm.
+
+On Render the service is stopped when idle, and the first visitor after a
+restart used to pay for importing Streamlit, pandas and Plotly, loading the
+dataset, filter indexes and cube, and building every figure of the default
+view. ``main`` first runs the dashboard once headlessly with Streamlit's
+``AppTest``, in this process, and only then hands over to ``streamlit run``.
+The modules are imported and the ``st.cache_resource`` caches (dataset,
+indexes, cube, result and figure caches) already hold the default view when
+the server starts accepting connections.
+
+    python -m telco_churn.serve telco_churn_dashboard.py --server.port=8501
+
+Everything after the script path is passed on to ``streamlit run``.
+``TELCO_WARMUP=0`` skips the warm-up.
+"""
+
+import os
+import sys
+import time
+
+# Longest a warm-up run may take before the server starts regardless
+WARMUP_TIMEOUT_S = 600
+
+
+def warm_up(script):
+    """Run ``script`` once headlessly and return the seconds it took."""
+    # AppTest swaps Streamlit's global runtime while it runs, so this must finish before the server starts
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    app = AppTest.from_file(os.path.abspath(script), default_timeout=WARMUP_TIMEOUT_S).run()
+    if app.exception:
+        print(f"warm-up of {script} raised: {app.exception[0].message}", file=sys.stderr)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv:
+        sys.exit("usage: python -m telco_churn.serve SCRIPT [streamlit run options]")
+    script = argv[0]
+    if os.environ.get("TELCO_WARMUP", "1") != "0":
+        try:
+            print(f"warmed up {script} in {warm_up(script):.1f}s", file=sys.stderr)
+        except Exception as e:
+            # A failed warm-up only costs the first visitor the cold start it was meant to spare them
+            print(f"warm-up of {script} failed: {e}", file=sys.stderr)
+
+    from streamlit.web import cli
+    cli.main(["run", *argv], prog_name="streamlit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Local HTTP service scoring customers with the churn model held in memory.
+
+Every ``predict_proba`` call pays a fixed overhead (input validation, a pass
+over all 100 trees) that dwarfs the cost of one customer, so concurrent
+requests are not scored one by one: ``MicroBatcher`` queues them and a single
+scoring thread takes whatever is waiting, up to ``MAX_BATCH`` records or
+``MAX_WAIT_MS`` after the first, encodes them as one frame and scores them in
+one call. A lone request waits at most ``MAX_WAIT_MS``.
+
+    python -m telco_churn.service --port 8502
+
+``POST /score`` takes one record or a list of records in the
+``ml_ready_telco.csv`` schema (missing features are imputed as in training)
+and answers with the model version and, per record, the predicted class and
+probabilities under the names Orange uses. ``GET /stats`` reports the p50 and
+p99 latency and the throughput over the last ``STATS_WINDOW`` requests, and
+the mean batch size. ``benchmarks/bench_service.py`` generates load against it.
+"""
+
+import argparse
+import collections
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from telco_churn.model import CLASS_VALUES, FEATURES, MODEL_PATH, PREDICTION_COL, PROBABILITY_COLS, load_model
+
+MAX_BATCH = int(os.environ.get("TELCO_SERVICE_MAX_BATCH", 256))
+MAX_WAIT_MS = float(os.environ.get("TELCO_SERVICE_MAX_WAIT_MS", 2))
+
+# Requests the latency and throughput statistics are computed over
+STATS_WINDOW = 10_000
+
+
+class LatencyStats:
+    """Latencies and batch sizes of the most recent requests."""
+
+    def __init__(self, window=STATS_WINDOW):
+        self._lock = threading.Lock()
+        # (finish time, seconds) per request
+        self._requests = collections.deque(maxlen=window)
+        self._batches = collections.deque(maxlen=window)
+        self.total_requests = 0
+
+    def record(self, finished, seconds):
+        with self._lock:
+            self._requests.append((finished, seconds))
+            self.total_requests += 1
+
+    def record_batch(self, rows):
+        with self._lock:
+            self._batches.append(rows)
+
+    def summary(self):
+        with self._lock:
+            requests = list(self._requests)
+            batches = list(self._batches)
+        if not requests:
+            return {"requests": self.total_requests}
+        finished, seconds = np.array(requests).T
+        span = finished[-1] - finished[0]
+        return {
+            "requests": self.total_requests,
+            "window": len(requests),
+            "p50_ms": float(np.percentile(seconds, 50) * 1e3),
+            "p99_ms": float(np.percentile(seconds, 99) * 1e3),
+            "throughput_rps": float((len(requests) - 1) / span) if span > 0 else None,
+            "mean_batch_rows": float(np.mean(batches)) if batches else None,
+        }
+
+
+class MicroBatcher:
+    """Score records from many threads in shared ``predict_proba`` calls."""
+
+    def __init__(self, model, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, stats=None):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1e3
+        self.stats = stats or LatencyStats()
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name="micro-batcher", daemon=True).start()
+
+    def score(self, records):
+        """Return the ``(n, 2)`` class probabilities of ``records``, blocking until scored."""
+        future = Future()
+        self._queue.put((records, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = time.perf_counter() + self.max_wait
+            while rows < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.perf_counter(), 0))
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self.stats.record_batch(rows)
+            self._score(batch)
+
+    def _score(self, batch):
+        try:
+            # Features a record leaves out come in as missing values
+            proba = self.model.predict_proba(pd.DataFrame(
+                [record for records, _ in batch for record in records], columns=FEATURES
+            ))
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+            else:
+                # One bad request must not fail the others batched with it
+                for item in batch:
+                    self._score([item])
+            return
+        start = 0
+        for records, future in batch:
+            future.set_result(proba[start:start + len(records)])
+            start += len(records)
+
+
+def prediction(proba):
+    return {
+        PREDICTION_COL: CLASS_VALUES[int(np.argmax(proba))],
+        **{col: float(p) for col, p in zip(PROBABILITY_COLS, proba)},
+    }
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so that a client does not pay a TCP handshake per customer
+    protocol_version = "HTTP/1.1"
+    # The headers and the body go out in separate writes; with Nagle's algorithm the body
+    # would wait for the client's delayed ACK, adding ~40 ms to every answer
+    disable_nagle_algorithm = True
+    batcher = None
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._reply(200, {"model_version": self.batcher.model.version, **self.batcher.stats.summary()})
+        elif self.path == "/health":
+            self._reply(200, {"status": "ok"})
+        else:
+            self._reply(404, {"error": f"no such path {self.path}"})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        if self.path != "/score":
+            self._reply(404, {"error": f"no such path {self.path}"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        except ValueError as e:
+            self._reply(400, {"error": f"invalid JSON: {e}"})
+            return
+        records = [body] if isinstance(body, dict) else body
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+            self._reply(400, {"error": "expected a record or a list of records"})
+            return
+        if not records:
+            self._reply(200, {"model_version": self.batcher.model.version, "predictions": []})
+            return
+        try:
+            proba = self.batcher.score(records)
+        except Exception as e:
+            self._reply(400, {"error": f"could not score records: {e}"})
+            return
+        self._reply(200, {
+            "model_version": self.batcher.model.version,
+            "predictions": [prediction(p) for p in proba],
+        })
+        finished = time.perf_counter()
+        self.batcher.stats.record(finished, finished - start)
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # One line per request would cost more than scoring it
+        pass
+
+
+class ScoringServer(ThreadingHTTPServer):
+    # The default backlog of 5 resets connections as soon as a few dozen clients connect at once
+    request_queue_size = 128
+
+
+def make_server(port, model_path=MODEL_PATH, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, host="127.0.0.1"):
+    handler = type("Handler", (ScoringHandler,), {
+        "batcher": MicroBatcher(load_model(model_path), max_batch, max_wait_ms),
+    })
+    return ScoringServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve churn scores over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.model, args.max_batch, args.max_wait_ms, args.host)
+    print(f"scoring with model {server.RequestHandlerClass.batcher.model.version} "
+          f"on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
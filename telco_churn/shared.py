@@ -0,0 +1,87 @@
+"""Read-only dataset shared across Streamlit sessions and server processes.
+
+The prepared frame is exported once as one ``.npy`` file per column (category
+codes for categoricals) and opened with ``mmap_mode="r"``. Every session gets
+the same frame object from ``st.cache_resource``, and every server process on
+the host maps the same files, so the operating system keeps a single physical
+copy of the customer table in its page cache.
+
+The arrays are read-only: callers must select rows with masks or index arrays
+and never modify the frame in place.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from telco_churn.data import DATA_PATH, SNAPSHOT_DIR, load_dataset, remove_stale, snapshot_path
+
+META_FILE = "meta.json"
+
+
+def columns_path(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR):
+    """Return the column directory matching the current snapshot of ``path``."""
+    return os.path.splitext(snapshot_path(path, snapshot_dir))[0] + ".columns"
+
+
+def export_columns(df, directory):
+    """Write ``df`` as memory-mappable columns into ``directory`` atomically."""
+    tmp = f"{directory}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        entry = {"name": name, "file": f"{i:03d}.npy", "categories": None, "ordered": False}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.cat.codes.to_numpy()
+            entry["categories"] = series.cat.categories.tolist()
+            entry["ordered"] = bool(series.cat.ordered)
+        else:
+            values = series.to_numpy()
+        np.save(os.path.join(tmp, entry["file"]), np.ascontiguousarray(values), allow_pickle=False)
+        columns.append(entry)
+
+    with open(os.path.join(tmp, META_FILE), "w") as f:
+        json.dump({"rows": len(df), "columns": columns}, f)
+
+    try:
+        os.replace(tmp, directory)
+    except OSError:
+        # Another process exported the same snapshot first; use theirs
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.exists(os.path.join(directory, META_FILE)):
+            raise
+
+
+def open_columns(directory):
+    """Return a frame whose columns are read-only memory maps of ``directory``."""
+    with open(os.path.join(directory, META_FILE)) as f:
+        meta = json.load(f)
+
+    data = {}
+    for entry in meta["columns"]:
+        values = np.load(os.path.join(directory, entry["file"]), mmap_mode="r")
+        if entry["categories"] is not None:
+            values = pd.Categorical.from_codes(values, entry["categories"], ordered=entry["ordered"])
+        data[entry["name"]] = values
+    # copy=False keeps one block per memory map instead of consolidating into new arrays
+    return pd.DataFrame(data, copy=False)
+
+
+def load_shared_dataset(path=DATA_PATH, snapshot_dir=SNAPSHOT_DIR):
+    """Open the memory-mapped dataset, exporting it from the snapshot if needed."""
+    directory = columns_path(path, snapshot_dir)
+    if not os.path.exists(os.path.join(directory, META_FILE)):
+        df = load_dataset(path, snapshot_dir)
+        try:
+            export_columns(df, directory)
+        except (OSError, ValueError):
+            # Without a writable cache each process keeps its own in-memory frame
+            return df
+        remove_stale(directory)
+    return open_columns(directory)
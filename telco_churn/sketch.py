@@ -0,0 +1,101 @@
+"""Mergeable quantile sketches and the box-plot summaries drawn from them.
+
+A sketch counts values in logarithmic buckets: bucket ``i`` holds the values
+in ``(GAMMA ** (i - 1), GAMMA ** i]``, and every quantile read back from it is
+within ``RELATIVE_ACCURACY`` of a true value. Two sketches merge by adding
+their counts bucket by bucket, which is what lets the cube keep one per cell
+and sum the cells of any filter combination, as it already does for its
+counts and totals.
+
+``box_summary`` turns a sketch into what a Plotly box trace draws: quartiles,
+whiskers at the last values inside the 1.5 IQR fences, and a capped sample of
+the outliers beyond them. A bucket stands for values up to 1% either side of
+it, so given the data's true minimum and maximum all of them are clamped to
+that range, and no whisker reaches past the data.
+"""
+
+import numpy as np
+
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = np.log(GAMMA)
+
+# Values at or below this share the lowest bucket; charges are all well above it
+MIN_VALUE = 1e-2
+
+# Outlier points drawn per box at most
+MAX_OUTLIERS = 200
+
+
+def bucket_index(values):
+    """Return the bucket of every value as an int64 array."""
+    values = np.maximum(np.asarray(values, dtype=np.float64), MIN_VALUE)
+    return np.ceil(np.log(values) / LOG_GAMMA).astype(np.int64)
+
+
+def bucket_value(index):
+    """Return the value a bucket stands for, equally close in ratio to both its bounds."""
+    return 2 * GAMMA ** np.asarray(index, dtype=np.float64) / (GAMMA + 1)
+
+
+def sketch(values):
+    """Return ``(buckets, counts)`` for the non-missing ``values``."""
+    values = np.asarray(values, dtype=np.float64)
+    buckets, counts = np.unique(bucket_index(values[~np.isnan(values)]), return_counts=True)
+    return buckets, counts
+
+
+def quantiles(buckets, counts, qs):
+    """Return the ``qs`` quantiles of a sketch with sorted ``buckets``, or NaNs if it is empty."""
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum()
+    if total <= 0:
+        return np.full(len(qs), np.nan)
+    # The bucket holding the value of rank floor(q * (n - 1)), the lower of the two values
+    # np.quantile's default (and Plotly's "linear" method) interpolates between; nothing is
+    # interpolated, within a bucket or across to the next
+    ranks = np.asarray(qs, dtype=np.float64) * (total - 1)
+    positions = np.searchsorted(np.cumsum(counts), ranks, side="right")
+    return bucket_value(np.asarray(buckets)[np.minimum(positions, len(buckets) - 1)])
+
+
+def box_summary(buckets, counts, mean=None, value_range=None, max_outliers=MAX_OUTLIERS):
+    """Return the box-plot statistics of a sketch as a dict, or ``None`` if it is empty.
+
+    ``mean`` may pass the exact mean (the cube keeps exact sums); otherwise it
+    is estimated from the buckets. ``value_range`` may pass the ``(min, max)``
+    of the values, or bounds around them, to clamp every statistic to; it is
+    narrowed to the edges of the first and last bucket holding values.
+    ``outliers`` holds at most ``max_outliers`` values spread evenly over all
+    the outliers.
+    """
+    buckets = np.asarray(buckets)
+    counts = np.asarray(counts, dtype=np.float64)
+    present = counts > 0
+    buckets, counts = buckets[present], counts[present]
+    if not len(buckets):
+        return None
+
+    low, high = GAMMA ** (buckets[0] - 1.0), GAMMA ** float(buckets[-1])
+    if value_range is not None:
+        low, high = max(low, value_range[0]), min(high, value_range[1])
+    q1, median, q3 = np.clip(quantiles(buckets, counts, (0.25, 0.5, 0.75)), low, high)
+    values = np.clip(bucket_value(buckets), low, high)
+    iqr = q3 - q1
+    inside = (values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)
+    outside = np.repeat(values[~inside], counts[~inside].astype(np.int64))
+    if len(outside) > max_outliers:
+        outside = outside[np.linspace(0, len(outside) - 1, max_outliers).round().astype(np.intp)]
+    if mean is None:
+        mean = float((values * counts).sum() / counts.sum())
+    return {
+        "count": int(counts.sum()),
+        "q1": float(q1),
+        "median": float(median),
+        "q3": float(q3),
+        "lowerfence": float(values[inside].min()) if inside.any() else float(q1),
+        "upperfence": float(values[inside].max()) if inside.any() else float(q3),
+        "mean": float(mean),
+        "outliers": outside,
+        "n_outliers": int(counts[~inside].sum()),
+    }
@@ -0,0 +1,192 @@
+"""Streaming ingestion for churn extracts too large to load in one frame.
+
+The CSV is read ``chunk_rows`` rows at a time. Each chunk goes through the same
+``prepare_frame`` as the dashboard loader and is folded into a
+``ChurnAggregates`` accumulator, then dropped. Peak memory is therefore bounded
+by the chunk size rather than the file size.
+
+    python -m telco_churn.streaming dataset/ml_ready_telco.csv --chunk-rows 250000
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from telco_churn.aggregation import churn_breakdowns, churn_flag
+from telco_churn.data import DATA_PATH, prepare_frame, read_dtypes
+
+DEFAULT_CHUNK_ROWS = 250_000
+
+# Dimensions the dashboard breaks churn down by
+CHURN_DIMENSIONS = ["Gender", "CitizenshipStatus", "Contract", "Internet Service",
+                    "Phone Service", "Number of Referrals", "Satisfaction Score"]
+
+# Histogram bin widths; bins are aligned to multiples of the width so chunks line up
+HISTOGRAM_WIDTHS = {"Age": 1, "Tenure": 1, "MonthlyCharges": 5.0}
+
+# Columns whose totals feed the KPI row
+SUM_COLS = ["MonthlyCharges", "TotalCharges", "Tenure", "Age", "Satisfaction Score"]
+
+
+def iter_chunks(path=DATA_PATH, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield prepared frames of at most ``chunk_rows`` rows from ``path``."""
+    # Only the categories are typed while parsing: a blank or stray text in a bool or
+    # numeric column would fail the whole read, where prepare_frame coerces it per chunk
+    # exactly as read_source does for the whole file
+    dtypes = {col: dtype for col, dtype in read_dtypes().items() if dtype == "category"}
+    with pd.read_csv(path, dtype=dtypes, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield prepare_frame(chunk)
+
+
+def _add(left, right):
+    if left is None:
+        return right
+    return left.add(right, fill_value=0)
+
+
+class ChurnAggregates:
+    """Mergeable totals, per-dimension churn counts and histograms."""
+
+    def __init__(self, dimensions=CHURN_DIMENSIONS, histogram_widths=HISTOGRAM_WIDTHS):
+        self.dimensions = list(dimensions)
+        self.histogram_widths = dict(histogram_widths)
+        self.rows = 0
+        self.churned = 0
+        self.sums = dict.fromkeys(SUM_COLS, 0.0)
+        self.churned_sums = dict.fromkeys(SUM_COLS, 0.0)
+        self.ranges = {}
+        self.breakdowns = dict.fromkeys(self.dimensions)
+        self.histograms = dict.fromkeys(self.histogram_widths)
+
+    def update(self, chunk):
+        """Fold a prepared chunk into the running aggregates."""
+        return self._fold(chunk, 1)
+
+    def remove(self, chunk):
+        """Take rows previously folded in back out again.
+
+        Counts and sums are exact; ``ranges`` only ever widen, so they may stay
+        wider than the remaining rows.
+        """
+        return self._fold(chunk, -1)
+
+    def _fold(self, chunk, sign):
+        if chunk.empty:
+            return self
+        flag = churn_flag(chunk["Churn"])
+        churn = flag.astype(bool)
+        self.rows += sign * len(chunk)
+        self.churned += sign * int(churn.sum())
+
+        for col in SUM_COLS:
+            if col in chunk.columns:
+                values = chunk[col].to_numpy(dtype=np.float64)
+                self.sums[col] += sign * float(np.nansum(values))
+                self.churned_sums[col] += sign * float(np.nansum(values[churn]))
+
+        if sign > 0:
+            for col in self.histogram_widths:
+                if col in chunk.columns:
+                    lo, hi = chunk[col].min(), chunk[col].max()
+                    if col in self.ranges:
+                        lo, hi = min(lo, self.ranges[col][0]), max(hi, self.ranges[col][1])
+                    self.ranges[col] = (lo, hi)
+
+        dims = [dim for dim in self.dimensions if dim in chunk.columns]
+        for dim, table in churn_breakdowns(chunk, dims, flag).items():
+            counts = table.set_index(dim)[["Churn", "Total"]]
+            self.breakdowns[dim] = _add(self.breakdowns[dim], sign * counts)
+
+        status = chunk["ChurnStatus"].to_numpy()
+        for col, width in self.histogram_widths.items():
+            if col in chunk.columns:
+                bins = np.floor(chunk[col].to_numpy(dtype=np.float64) / width) * width
+                counts = pd.crosstab(bins, status)
+                self.histograms[col] = _add(self.histograms[col], sign * counts)
+        return self
+
+    def merge(self, other):
+        """Combine with aggregates built from a disjoint set of rows."""
+        self.rows += other.rows
+        self.churned += other.churned
+        for col in SUM_COLS:
+            self.sums[col] += other.sums[col]
+            self.churned_sums[col] += other.churned_sums[col]
+        for col, (lo, hi) in other.ranges.items():
+            if col in self.ranges:
+                lo, hi = min(lo, self.ranges[col][0]), max(hi, self.ranges[col][1])
+            self.ranges[col] = (lo, hi)
+        for dim, table in other.breakdowns.items():
+            if table is not None:
+                self.breakdowns[dim] = _add(self.breakdowns.get(dim), table)
+        for col, table in other.histograms.items():
+            if table is not None:
+                self.histograms[col] = _add(self.histograms.get(col), table)
+        return self
+
+    def kpis(self):
+        """Return the dashboard's KPI values."""
+        rows = self.rows
+        churn_rate = (self.churned / rows * 100) if rows > 0 else 0
+        return {
+            "total_customers": rows,
+            "churned_customers": self.churned,
+            "retained_customers": rows - self.churned,
+            "churn_rate": churn_rate,
+            "retention_rate": 100 - churn_rate,
+            "monthly_revenue_loss": self.churned_sums["MonthlyCharges"],
+            "avg_monthly_charges": self.sums["MonthlyCharges"] / rows if rows else 0,
+            "total_revenue": self.sums["TotalCharges"],
+            "avg_tenure": self.sums["Tenure"] / rows if rows else 0,
+            "avg_age": self.sums["Age"] / rows if rows else 0,
+            "satisfaction_score": self.sums["Satisfaction Score"] / rows if rows else 0,
+        }
+
+    def breakdown(self, dim):
+        """Return ``[dim, Churn, Total, Churn_Rate]`` for one dimension."""
+        table = self.breakdowns[dim]
+        if table is None:
+            return pd.DataFrame(columns=[dim, "Churn", "Total", "Churn_Rate"])
+        table = table.astype(np.int64).sort_index()
+        table = table[table["Total"] > 0]
+        table["Churn_Rate"] = (table["Churn"] / table["Total"] * 100).round(1)
+        return table.rename_axis(dim).reset_index()
+
+    def histogram(self, col):
+        """Return bin start and churned/retained counts for ``col``."""
+        table = self.histograms[col]
+        if table is None:
+            return pd.DataFrame(columns=[col, "Churned", "Retained"])
+        table = table.reindex(columns=["Churned", "Retained"], fill_value=0)
+        table = table.fillna(0).astype(np.int64).sort_index()
+        table = table[table.sum(axis=1) > 0]
+        return table.rename_axis(index=col, columns=None).reset_index()
+
+
+def stream_aggregates(path=DATA_PATH, chunk_rows=DEFAULT_CHUNK_ROWS, aggregates=None):
+    """Fold every chunk of ``path`` into ``aggregates`` without keeping the rows."""
+    if aggregates is None:
+        aggregates = ChurnAggregates()
+    for chunk in iter_chunks(path, chunk_rows):
+        aggregates.update(chunk)
+    return aggregates
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a churn extract in bounded memory.")
+    parser.add_argument("path", nargs="?", default=DATA_PATH)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    aggregates = stream_aggregates(args.path, args.chunk_rows)
+    for name, value in aggregates.kpis().items():
+        print(f"{name:>22}: {value:,.2f}")
+    for dim in aggregates.dimensions:
+        print()
+        print(aggregates.breakdown(dim).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""Static CSS of the dashboard's dark theme.
+
+The stylesheet only depends on the ``COLORS`` palette, so it is formatted once
+when the module is first imported instead of on every rerun of the script.
+
+The Inter ``@import`` stays: every heading, card and chart is set in Inter.
+It costs the server nothing, since the visitor's browser fetches the font once
+and caches it, and ``display=swap`` shows the text in the fallback font until
+the font arrives instead of holding back the page.
+"""
+
+from telco_churn.palette import COLORS
+
+# Enhanced Custom CSS for dark theme with high contrast
+DASHBOARD_CSS = f"""
+<style>
+    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+
+    .main {{
+        background: {COLORS['background']};
+        min-height: 100vh;
+        padding: 20px;
+    }}
+
+    .header-container {{
+        background: {COLORS['surface']};
+        backdrop-filter: blur(12px);
+        border-radius: 16px;
+        padding: 24px;
+        margin-bottom: 32px;
+        border: 1px solid {COLORS['border']};
+        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.2);
+        transition: transform 0.3s ease;
+    }}
+
+    .header-container:hover {{
+        transform: translateY(-4px);
+    }}
+
+    .logo-container {{
+        display: flex;
+        align-items: center;
+        gap: 16px;
+        margin-bottom: 12px;
+    }}
+
+    .logo-placeholder {{
+        width: 64px;
+        height: 64px;
+        background: linear-gradient(45deg, {COLORS['accent']}, {COLORS['info']});
+        border-radius: 16px;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        font-size: 28px;
+        color: {COLORS['light']};
+        font-weight: 700;
+        box-shadow: 0 6px 20px rgba(0, 0, 0, 0.2);
+        transition: transform 0.3s ease;
+    }}
+
+    .logo-placeholder:hover {{
+        transform: scale(1.05);
+    }}
+
+    .company-name {{
+        font-family: 'Inter', sans-serif;
+        font-size: 32px;
+        font-weight: 700;
+        color: {COLORS['primary']};
+        margin: 0;
+        text-shadow: 0 2px 4px rgba(0, 0, 0, 0.3);
+    }}
+
+    .company-tagline {{
+        font-family: 'Inter', sans-serif;
+        font-size: 16px;
+        color: {COLORS['secondary']};
+        margin: 0;
+        font-weight: 400;
+    }}
+
+    .stTabs [data-baseweb="tab"] {{
+        font-family: 'Inter', sans-serif;
+        font-size: 16px;
+        font-weight: 600;
+        color: {COLORS['primary']};
+        background: {COLORS['surface']};
+        border-radius: 12px;
+        padding: 12px 24px;
+        margin-right: 8px;
+        border: 1px solid {COLORS['border']};
+        transition: all 0.3s ease;
+    }}
+
+    .stTabs [data-baseweb="tab"]:hover {{
+        background: {COLORS['border']};
+        transform: translateY(-2px);
+        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.2);
+    }}
+
+    .stTabs [data-baseweb="tab"][aria-selected="true"] {{
+        background: linear-gradient(45deg, {COLORS['accent']}, {COLORS['info']});
+        color: {COLORS['light']};
+        box-shadow: 0 6px 20px rgba(0, 0, 0, 0.2);
+    }}
+
+    /* The lazy section picker is a horizontal radio drawn like the tabs */
+    .stRadio [role="radiogroup"] label[data-baseweb="radio"] {{
+        font-family: 'Inter', sans-serif;
+        background: {COLORS['surface']};
+        border-radius: 12px;
+        padding: 12px 24px;
+        margin-right: 8px;
+        border: 1px solid {COLORS['border']};
+        transition: all 0.3s ease;
+    }}
+
+    .stRadio [role="radiogroup"] label[data-baseweb="radio"] > div:first-child {{
+        display: none;
+    }}
+
+    .stRadio [role="radiogroup"] label[data-baseweb="radio"]:hover {{
+        background: {COLORS['border']};
+        transform: translateY(-2px);
+    }}
+
+    .stRadio [role="radiogroup"] label[data-baseweb="radio"]:has(input:checked) {{
+        background: linear-gradient(45deg, {COLORS['accent']}, {COLORS['info']});
+        box-shadow: 0 6px 20px rgba(0, 0, 0, 0.2);
+    }}
+
+    .stRadio [role="radiogroup"] label[data-baseweb="radio"] p {{
+        font-size: 16px;
+        font-weight: 600;
+        color: {COLORS['primary']};
+    }}
+
+    .metric-card {{
+        background: {COLORS['surface']};
+        padding: 24px;
+        border-radius: 16px;
+        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.2);
+        text-align: center;
+        margin-bottom: 24px;
+        border: 1px solid {COLORS['border']};
+        transition: transform 0.3s ease, box-shadow 0.3s ease;
+        backdrop-filter: blur(12px);
+    }}
+
+    .metric-card:hover {{
+        transform: translateY(-6px);
+        box-shadow: 0 12px 32px rgba(0, 0, 0, 0.25);
+    }}
+
+    .metric-title {{
+        font-family: 'Inter', sans-serif;
+        font-size: 16px;
+        color: {COLORS['secondary']};
+        margin-bottom: 8px;
+        font-weight: 500;
+        text-transform: uppercase;
+        letter-spacing: 0.8px;
+    }}
+
+    .metric-value {{
+        font-family: 'Inter', sans-serif;
+        font-size: 32px;
+        font-weight: 700;
+        color: {COLORS['primary']};
+        margin-bottom: 6px;
+    }}
+
+    .metric-delta {{
+        font-family: 'Inter', sans-serif;
+        font-size: 14px;
+        color: {COLORS['danger']};
+        font-weight: 600;
+    }}
+
+    .metric-delta.positive {{
+        color: {COLORS['success']};
+    }}
+
+    .insight-card {{
+        background: {COLORS['surface']};
+        border-radius: 16px;
+        padding: 24px;
+        margin: 24px 0;
+        border-left: 6px solid {COLORS['accent']};
+        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.2);
+        backdrop-filter: blur(12px);
+        transition: transform 0.3s ease;
+    }}
+
+    .insight-card:hover {{
+        transform: translateY(-4px);
+    }}
+
+    .insight-title {{
+        font-family: 'Inter', sans-serif;
+        font-size: 20px;
+        font-weight: 600;
+        color: {COLORS['primary']};
+        margin-bottom: 12px;
+    }}
+
+    .insight-text {{
+        font-family: 'Inter', sans-serif;
+        font-size: 16px;
+        color: {COLORS['secondary']};
+        line-height: 1.7;
+    }}
+
+    h1, h2, h3 {{
+        font-family: 'Inter', sans-serif;
+        color: {COLORS['primary']};
+        font-weight: 600;
+    }}
+
+    .stMarkdown {{
+        font-family: 'Inter', sans-serif;
+        color: {COLORS['secondary']};
+    }}
+
+    .stSidebar {{
+        background: {COLORS['surface']};
+        color: {COLORS['secondary']};
+        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.2);
+    }}
+
+    .stSidebar .stMultiSelect div, .stSidebar .stSlider div {{
+        color: {COLORS['primary']};
+    }}
+
+    .stButton>button {{
+        background: linear-gradient(45deg, {COLORS['accent']}, {COLORS['info']});
+        color: {COLORS['light']};
+        border-radius: 12px;
+        border: none;
+        padding: 10px 20px;
+        font-family: 'Inter', sans-serif;
+        font-weight: 600;
+        transition: all 0.3s ease;
+    }}
+
+    .stButton>button:hover {{
+        transform: translateY(-2px);
+        box-shadow: 0 6px 20px rgba(0, 0, 0, 0.2);
+    }}
+
+    .filter-section {{
+        background: {COLORS['surface']};
+        border-radius: 16px;
+        padding: 24px;
+        margin-bottom: 24px;
+        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.2);
+        backdrop-filter: blur(12px);
+    }}
+
+    .section-header {{
+        font-family: 'Inter', sans-serif;
+        font-size: 24px;
+        font-weight: 600;
+        color: {COLORS['primary']};
+        margin-bottom: 16px;
+        text-align: center;
+    }}
+
+    .dashboard-subtitle {{
+        font-family: 'Inter', sans-serif;
+        font-size: 18px;
+        color: {COLORS['secondary']};
+        text-align: center;
+        margin-bottom: 32px;
+        font-weight: 400;
+    }}
+</style>
+"""
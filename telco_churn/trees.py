@@ -0,0 +1,114 @@
+"""Flat array form of the churn model's tree ensemble.
+
+scikit-learn walks the 100 boosted trees one at a time, each a separate
+object whose ``predict`` validates its input again: a fixed ~0.15 ms that is
+all of the cost of scoring one customer. ``TreeEnsemble`` lays every tree out
+as a complete binary tree of the deepest tree's depth, in heap order, so that
+the whole ensemble is four contiguous arrays: the split feature and threshold
+of every internal slot, and the value of every leaf slot (already scaled by
+the learning rate). A leaf above the last level is copied into all the leaf
+slots below it and the slots in between never send a sample right.
+
+``raw_predict`` compares the features of all samples against all real splits
+in one operation, then picks the bit of each level with boolean masks of the
+path taken so far, so a batch costs a fixed number of array operations
+whatever its size. Thresholds are rounded down to float32 (``x <= t`` holds
+for a float32 ``x`` exactly when it holds for the float64 ``t``), so every
+sample ends in the same leaf as in scikit-learn; only the order in which the
+leaf values are summed differs.
+"""
+
+import numpy as np
+
+# Samples evaluated together; their (trees, splits, BLOCK_ROWS) comparisons stay in cache
+BLOCK_ROWS = 1024
+
+
+class TreeEnsemble:
+    """The trees of a binary ``GradientBoostingClassifier`` as flat arrays."""
+
+    def __init__(self, feature, threshold, value, depth, init):
+        # (n_trees, 2**depth - 1) split of every internal slot, feature 0 and an infinite
+        # threshold where a slot only pads a shallower branch
+        self.feature = feature
+        self.threshold = threshold
+        # (n_trees, 2**depth) leaf values
+        self.value = value
+        self.depth = depth
+        # Raw prediction (log-odds) before the first tree
+        self.init = init
+        self._splits = np.flatnonzero(np.isfinite(threshold.ravel()))
+        self._leaf_offsets = (np.arange(len(value), dtype=np.intp) * value.shape[1])[:, None]
+
+    @classmethod
+    def from_gradient_boosting(cls, estimator):
+        trees = [tree.tree_ for tree in estimator.estimators_[:, 0]]
+        depth = max(tree.max_depth for tree in trees)
+        n_internal = 2**depth - 1
+        feature = np.zeros((len(trees), n_internal), dtype=np.intp)
+        threshold = np.full((len(trees), n_internal), np.inf)
+        value = np.zeros((len(trees), 2**depth))
+        for i, tree in enumerate(trees):
+            # (node, heap slot, level) still to place
+            stack = [(0, 0, 0)]
+            while stack:
+                node, slot, level = stack.pop()
+                if level == depth:
+                    value[i, slot - n_internal] = tree.value[node, 0, 0] * estimator.learning_rate
+                elif tree.children_left[node] == -1:
+                    stack += [(node, 2 * slot + 1, level + 1), (node, 2 * slot + 2, level + 1)]
+                else:
+                    feature[i, slot] = tree.feature[node]
+                    threshold[i, slot] = tree.threshold[node]
+                    stack += [(tree.children_left[node], 2 * slot + 1, level + 1),
+                              (tree.children_right[node], 2 * slot + 2, level + 1)]
+        rounded = threshold.astype(np.float32)
+        above = rounded > threshold
+        rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+        ensemble = cls(feature=feature, threshold=rounded, value=value, depth=depth, init=0.0)
+        # The raw prediction before the first tree (the prior's log-odds) is not public: it is
+        # what the decision function adds to the trees' sum, the same for every sample
+        sample = np.zeros((1, estimator.n_features_in_), dtype=np.float32)
+        ensemble.init = float(estimator.decision_function(sample)[0] - ensemble.raw_predict(sample)[0])
+        return ensemble
+
+    def raw_predict(self, X):
+        """Return the log-odds of the positive class for every row of ``X``."""
+        X = np.asarray(X, dtype=np.float32)
+        raw = np.empty(len(X))
+        for start in range(0, len(X), BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            raw[start:start + len(block)] = self.init + self.value.ravel()[self._leaves(block)].sum(axis=0)
+        return raw
+
+    def _leaves(self, X):
+        """Return the ``(n_trees, len(X))`` flat index into ``value`` of the leaf every sample reaches."""
+        n_trees, n_internal = self.threshold.shape
+        features = np.ascontiguousarray(X.T)
+        right = np.zeros((n_trees * n_internal, len(X)), dtype=bool)
+        right[self._splits] = (
+            features[self.feature.ravel()[self._splits]] > self.threshold.ravel()[self._splits, None]
+        )
+        right = right.reshape(n_trees, n_internal, len(X))
+        leaf = np.zeros((n_trees, len(X)), dtype=np.intp)
+        # paths[k]: the samples at slot k of the current level
+        paths = [np.ones((n_trees, len(X)), dtype=bool)]
+        for level in range(self.depth):
+            slots = right[:, 2**level - 1:2**(level + 1) - 1]
+            if level == 0:
+                bit = slots[:, 0]
+            else:
+                bit = np.zeros((n_trees, len(X)), dtype=bool)
+                for k, path in enumerate(paths):
+                    bit |= slots[:, k] & path
+            if level < self.depth - 1:
+                paths = [side for path in paths for side in (path & ~bit, path & bit)]
+            leaf = leaf * 2 + bit
+        return leaf + self._leaf_offsets
+
+    def predict_proba(self, X):
+        """Return the ``(n, 2)`` class probabilities, as ``GradientBoostingClassifier`` does."""
+        with np.errstate(over="ignore"):
+            # exp overflows to inf for very negative log-odds, giving the right limit of 0
+            positive = 1 / (1 + np.exp(-self.raw_predict(X)))
+        return np.column_stack([1 - positive, positive])
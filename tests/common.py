@@ -0,0 +1,29 @@
+"""Paths and filter states shared by the tests."""
+
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ML_READY_PATH = os.path.join(ROOT, "dataset", "ml_ready_telco.csv")
+RAW_PATH = os.path.join(ROOT, "dataset", "telco.csv")
+
+# Sidebar states, down to one that matches no customer
+STATES = [
+    {},
+    {"Gender": ["Female"], "Contract": ["Month-to-Month", "One Year"], "Internet Service": [True],
+     "Age": (25, 65), "Tenure": (6, 60)},
+    {"Contract": ["Two Year"], "Age": (19, 19)},
+    {"Gender": ["Male"], "Tenure": (72, 72)},
+    {"Internet Service": [False], "Age": (80, 19)},
+]
+
+
+def chained(df, state):
+    """The dashboard's original filter block."""
+    filtered_df = df.copy()
+    for col in ("Gender", "Contract", "Internet Service"):
+        if col in state:
+            filtered_df = filtered_df[filtered_df[col].isin(state[col])]
+    for col in ("Age", "Tenure"):
+        if col in state:
+            filtered_df = filtered_df[filtered_df[col].between(*state[col])]
+    return filtered_df
@@ -0,0 +1,26 @@
+"""Shared fixtures: the repository's datasets."""
+
+import pandas as pd
+import pytest
+
+from telco_churn.data import prepare_frame, read_csv
+from telco_churn.model import train
+from tests.common import ML_READY_PATH, RAW_PATH
+
+
+@pytest.fixture(scope="session")
+def customers():
+    """The prepared ``dataset/ml_ready_telco.csv``; tests must not modify it."""
+    return prepare_frame(read_csv(ML_READY_PATH))
+
+
+@pytest.fixture(scope="session")
+def raw_customers():
+    """The raw ``dataset/telco.csv`` extract the incremental store is seeded from."""
+    return pd.read_csv(RAW_PATH)
+
+
+@pytest.fixture(scope="session")
+def model():
+    """The workflow's model, trained here as models/ is not part of the repository."""
+    return train(ML_READY_PATH)[0]
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from telco_churn.cube import ChurnCube
+from telco_churn.streaming import CHURN_DIMENSIONS
+from tests.common import STATES, chained
+
+
+@pytest.fixture(scope="module")
+def cube(customers):
+    # Small chunks, so that cells are folded across chunks as in a large build
+    return ChurnCube.from_frame(customers, chunk_rows=1000)
+
+
+def scan_kpis(df):
+    churned = df[df["Churn"] == "Yes"]
+    rows = len(df)
+    return {
+        "total_customers": rows,
+        "churned_customers": len(churned),
+        "retained_customers": rows - len(churned),
+        "churn_rate": len(churned) / rows * 100 if rows else 0,
+        "monthly_revenue_loss": churned["MonthlyCharges"].astype("float64").sum(),
+        "avg_monthly_charges": df["MonthlyCharges"].astype("float64").mean() if rows else 0,
+        "total_revenue": df["TotalCharges"].astype("float64").sum(),
+        "avg_tenure": df["Tenure"].mean() if rows else 0,
+        "avg_age": df["Age"].mean() if rows else 0,
+        "satisfaction_score": df["Satisfaction Score"].mean() if rows else 0,
+    }
+
+
+@pytest.mark.parametrize("state", STATES)
+def test_kpis_equal_row_scan(customers, cube, state):
+    kpis = cube.kpis(state)
+    for name, expected in scan_kpis(chained(customers, state)).items():
+        assert kpis[name] == pytest.approx(expected, rel=1e-9, abs=1e-6), name
+
+
+@pytest.mark.parametrize("state", STATES)
+def test_breakdowns_equal_row_scan(customers, cube, state):
+    filtered_df = chained(customers, state)
+    breakdowns = cube.breakdowns(CHURN_DIMENSIONS, state)
+    for dim in CHURN_DIMENSIONS:
+        groups = (filtered_df["Churn"] == "Yes").groupby(filtered_df[dim], observed=True)
+        expected = pd.DataFrame({"Churn": groups.sum(), "Total": groups.size()})
+        # The cube orders the groups by label, the scan by category code
+        expected = expected.set_axis(expected.index.astype(object)).sort_index()
+        table = breakdowns[dim].set_index(dim)
+        np.testing.assert_array_equal(table.index.to_numpy(), expected.index.to_numpy(), err_msg=dim)
+        np.testing.assert_array_equal(table["Churn"], expected["Churn"], err_msg=dim)
+        np.testing.assert_array_equal(table["Total"], expected["Total"], err_msg=dim)
+
+
+@pytest.mark.parametrize("state", STATES)
+def test_revenue_by_status_equals_row_scan(customers, cube, state):
+    filtered_df = chained(customers, state)
+    expected = filtered_df["TotalCharges"].astype("float64").groupby(filtered_df["ChurnStatus"], observed=True).sum()
+    table = cube.revenue_by_status(state).set_index("ChurnStatus")["TotalCharges"]
+    assert list(table.index) == list(expected.index)
+    np.testing.assert_allclose(table.to_numpy(), expected.to_numpy(), rtol=1e-9)
+
+
+@pytest.mark.parametrize("state", STATES)
+def test_box_stats_stay_within_row_scan(customers, cube, state):
+    filtered_df = chained(customers, state)
+    charges = filtered_df["MonthlyCharges"].astype("float64").groupby(filtered_df["ChurnStatus"], observed=True)
+    boxes = cube.box_stats("MonthlyCharges", state)
+    assert boxes.keys() == {status for status, count in charges.size().items() if count}
+    for status, box in boxes.items():
+        values = charges.get_group(status)
+        assert box["count"] == len(values)
+        assert box["mean"] == pytest.approx(values.mean())
+        # The quartiles are estimates, but every statistic lies within the data
+        assert values.min() <= box["lowerfence"] <= box["q1"] <= box["median"] <= box["q3"]
+        assert box["q3"] <= box["upperfence"] <= values.max()
+
+
+def test_removing_rows_equals_building_without_them(customers):
+    cube = ChurnCube.from_frame(customers)
+    cube.remove(customers.iloc[:500])
+    rebuilt = ChurnCube.from_frame(customers.iloc[500:])
+    assert cube.kpis() == pytest.approx(rebuilt.kpis())
+    for dim in CHURN_DIMENSIONS:
+        pd.testing.assert_frame_equal(cube.breakdown(dim), rebuilt.breakdown(dim))
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from telco_churn.filters import FilterEngine
+from telco_churn.indexes import SortedRangeIndex, bitmap_to_mask
+from tests.common import STATES, chained
+
+
+@pytest.fixture
+def missing_age(customers):
+    """The customers with a few blank ages, which ``apply_schema`` reads as NaN."""
+    df = customers.copy()
+    df["Age"] = df["Age"].astype("float32")
+    df.loc[[0, 10, len(df) - 1], "Age"] = np.nan
+    return df
+
+
+def expected_mask(df, state):
+    mask = np.zeros(len(df), dtype=bool)
+    mask[df.index.get_indexer(chained(df, state).index)] = True
+    return mask
+
+
+@pytest.mark.parametrize("state", STATES)
+@pytest.mark.parametrize("indexed", [False, True])
+def test_mask_equals_chained_filters(customers, state, indexed):
+    engine = FilterEngine(customers, indexed=indexed)
+    np.testing.assert_array_equal(engine.mask(state), expected_mask(customers, state))
+
+
+@pytest.mark.parametrize("state", STATES)
+def test_saved_indexes_equal_chained_filters(customers, state, tmp_path):
+    FilterEngine(customers, indexed=True, index_dir=str(tmp_path))
+    # The second engine maps the indexes the first one saved
+    engine = FilterEngine(customers, indexed=True, index_dir=str(tmp_path))
+    np.testing.assert_array_equal(engine.mask(state), expected_mask(customers, state))
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_bounds_equal_column_range(customers, indexed):
+    engine = FilterEngine(customers, indexed=indexed)
+    for spec in engine.filters:
+        if spec.kind == "range":
+            assert engine.bounds(spec) == (customers[spec.column].min(), customers[spec.column].max())
+
+
+@pytest.mark.parametrize("state", STATES + [{"Age": (0, 100)}])
+def test_missing_age_is_filtered_out(missing_age, state, tmp_path):
+    for engine in (FilterEngine(missing_age), FilterEngine(missing_age, indexed=True),
+                   FilterEngine(missing_age, indexed=True, index_dir=str(tmp_path))):
+        np.testing.assert_array_equal(engine.mask(state), expected_mask(missing_age, state))
+
+
+@pytest.mark.parametrize("state", STATES + [
+    {"Gender": ["Female", "Male"]},
+    {"Contract": ["Month-to-Month", "One Year", "Two Year"], "Age": (30, 60)},
+])
+@pytest.mark.parametrize("indexed", [False, True])
+def test_missing_category_is_filtered_out(customers, state, indexed):
+    df = customers.copy()
+    df.loc[[0, 10], "Gender"] = np.nan
+    df.loc[[5, len(df) - 1], "Contract"] = np.nan
+    engine = FilterEngine(df, indexed=indexed)
+    np.testing.assert_array_equal(engine.mask(state), expected_mask(df, state))
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_bounds_ignore_missing_age(missing_age, indexed):
+    engine = FilterEngine(missing_age, indexed=indexed)
+    spec = next(spec for spec in engine.filters if spec.column == "Age")
+    assert engine.bounds(spec) == (missing_age["Age"].min(), missing_age["Age"].max())
+
+
+@pytest.mark.parametrize("bounds", [(0, 200), (20, 120), (50, 60), (200, 300)])
+def test_sorted_permutation_ignores_missing_values(customers, bounds):
+    # Monthly charges have too many distinct values for prefix bitmaps
+    charges = customers["MonthlyCharges"].copy()
+    charges.iloc[[0, 5, 7]] = np.nan
+    index = SortedRangeIndex(charges)
+    assert index.order is not None
+    assert index.bounds == (charges.min(), charges.max())
+    bitmap = index.lookup(*bounds)
+    mask = np.ones(len(charges), dtype=bool) if bitmap is None else bitmap_to_mask(bitmap, len(charges))
+    np.testing.assert_array_equal(mask, charges.between(*bounds).to_numpy())
+
+
+def test_stale_saved_index_is_replaced(missing_age, tmp_path):
+    directory = str(tmp_path / "Age.index")
+    stale = SortedRangeIndex(missing_age["Age"])
+    # An index saved before missing values were left out ends in NaN
+    stale.distinct = np.append(stale.distinct, np.nan)
+    stale.save(directory)
+    index = SortedRangeIndex.open(missing_age["Age"], directory)
+    assert index.bounds == (missing_age["Age"].min(), missing_age["Age"].max())
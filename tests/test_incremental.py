@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from telco_churn.incremental import ID_COL, load_aggregates, load_store_cube, read_index, read_store, refresh
+from telco_churn.streaming import CHURN_DIMENSIONS
+from tests.common import STATES
+
+
+def next_quarter(raw, seed=0):
+    """Return a batch that updates a sample of ``raw``'s customers and adds as many new ones."""
+    rng = np.random.default_rng(seed)
+    updated = raw.sample(300, random_state=seed).copy()
+    updated["Tenure in Months"] = np.minimum(updated["Tenure in Months"] + 3, 72)
+    updated["Monthly Charge"] += rng.normal(0, 5, len(updated)).round(2)
+    updated["Churn Label"] = np.where(rng.random(len(updated)) < 0.3, "Yes", updated["Churn Label"])
+    updated["Quarter"] = "Q4"
+    added = raw.sample(300, random_state=seed + 1).copy()
+    added[ID_COL] = [f"NEW-{i:05d}" for i in range(len(added))]
+    return pd.concat([updated, added], ignore_index=True)
+
+
+def upsert(raw, batch):
+    """The rows a store holds after ``batch`` is refreshed into ``raw``."""
+    return pd.concat([raw[~raw[ID_COL].isin(batch[ID_COL])], batch], ignore_index=True)
+
+
+@pytest.fixture(scope="module")
+def stores(raw_customers, tmp_path_factory):
+    """An incrementally refreshed store, and one built from the upserted rows in a single refresh."""
+    incremental = str(tmp_path_factory.mktemp("incremental"))
+    full = str(tmp_path_factory.mktemp("full"))
+    refresh(raw_customers, incremental)
+    batch = next_quarter(raw_customers)
+    stats = refresh(batch, incremental)
+    assert (stats["new"], stats["updated"]) == (300, 300)
+    refresh(upsert(raw_customers, batch), full)
+    return incremental, full
+
+
+def by_customer(store_dir):
+    """The live rows of a store in Customer ID order."""
+    index = read_index(store_dir)
+    df = read_store(store_dir)
+    # read_store returns the rows part by part, in row order within each part
+    df.index = index.sort_values(["part", "row"]).index
+    return df.sort_index()
+
+
+def test_rows_equal_full_recompute(stores):
+    incremental, full = (by_customer(store) for store in stores)
+    pd.testing.assert_frame_equal(incremental, full, check_categorical=False)
+
+
+def test_aggregates_equal_full_recompute(stores):
+    incremental, full = (load_aggregates(store) for store in stores)
+    assert incremental.kpis() == pytest.approx(full.kpis())
+    for dim in CHURN_DIMENSIONS:
+        pd.testing.assert_frame_equal(incremental.breakdown(dim), full.breakdown(dim))
+
+
+@pytest.mark.parametrize("state", STATES)
+def test_cube_equals_full_recompute(stores, state):
+    incremental, full = (load_store_cube(store) for store in stores)
+    assert incremental.kpis(state) == pytest.approx(full.kpis(state))
+    for dim in CHURN_DIMENSIONS:
+        pd.testing.assert_frame_equal(incremental.breakdown(dim, state), full.breakdown(dim, state))
+    incremental_box, full_box = incremental.box_stats("MonthlyCharges", state), full.box_stats("MonthlyCharges", state)
+    assert incremental_box.keys() == full_box.keys()
+    for status, box in full_box.items():
+        np.testing.assert_allclose(incremental_box[status].pop("outliers"), box.pop("outliers"))
+        assert incremental_box[status] == pytest.approx(box)
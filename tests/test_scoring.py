@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from telco_churn.data import read_csv
+from telco_churn.model import PROBABILITY_COLS, save_model
+from telco_churn.scoring import score_file
+from tests.common import ML_READY_PATH
+
+
+@pytest.fixture(scope="module")
+def model_path(model, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("model") / "gradient_boosting.pkl")
+    save_model(model, path)
+    return path
+
+
+@pytest.fixture(scope="module")
+def dirty_path(tmp_path_factory):
+    """The first 2,000 customers with a blank in a bool, a category and a numeric column."""
+    lines = open(ML_READY_PATH).read().splitlines(keepends=True)[:2001]
+    columns = lines[0].rstrip("\n").split(",")
+    for row, col in ((1, "Married"), (500, "Contract"), (1500, "Age")):
+        fields = lines[row].split(",")
+        fields[columns.index(col)] = ""
+        lines[row] = ",".join(fields)
+    path = tmp_path_factory.mktemp("input") / "dirty.csv"
+    path.write_text("".join(lines))
+    return str(path)
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_blank_values_score_like_read_csv(model, model_path, dirty_path, tmp_path, cached):
+    output = str(tmp_path / "scores.csv")
+    # Small chunks, so that clean chunks and the dirty ones are parsed apart
+    stats = score_file(dirty_path, output, model_path, workers=0, chunk_bytes=64 * 1024,
+                       cache_dir=str(tmp_path / "cache") if cached else None)
+    expected = model.predict_proba(read_csv(dirty_path))
+    scores = pd.read_csv(output)
+    assert stats["rows"] == len(expected)
+    np.testing.assert_allclose(scores[PROBABILITY_COLS].to_numpy(), expected, rtol=0, atol=1e-15)
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from telco_churn.data import read_csv
+from telco_churn.model import FLAT_MAX_ROWS
+from tests.common import ML_READY_PATH
+
+
+@pytest.fixture(scope="module")
+def X(model):
+    # The model reads the source columns, before the dashboard's renames
+    return model.encode(read_csv(ML_READY_PATH))
+
+
+def test_flat_trees_match_scikit_learn(model, X):
+    np.testing.assert_allclose(model.trees.predict_proba(X), model.estimator.predict_proba(X), rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("n_rows", [1, 7, FLAT_MAX_ROWS, FLAT_MAX_ROWS + 1])
+def test_predict_proba_encoded_matches_scikit_learn(model, X, n_rows):
+    batch = X[:n_rows]
+    np.testing.assert_allclose(model.predict_proba_encoded(batch), model.estimator.predict_proba(batch),
+                               rtol=0, atol=1e-12)
+
+
+def test_same_leaves_as_scikit_learn(model, X):
+    # Thresholds rounded to float32 must send every sample down the same path
+    n_trees, n_leaves = model.trees.value.shape
+    leaves = model.trees._leaves(X[:1024]) - np.arange(n_trees)[:, None] * n_leaves
+    values = model.trees.value[np.arange(n_trees)[:, None], leaves]
+    expected = np.stack([tree.predict(X[:1024]) for tree in model.estimator.estimators_[:, 0]])
+    np.testing.assert_allclose(values, expected * model.estimator.learning_rate, rtol=0, atol=1e-15)